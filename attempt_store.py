@@ -0,0 +1,390 @@
+import pickle
+import threading
+from collections import Counter
+from itertools import groupby, islice
+from operator import itemgetter
+from typing import NamedTuple
+try:
+    import sqlite3
+except ImportError:  # Python can be built without sqlite3, the store is optional
+    sqlite3 = None
+
+from statistics_log import StatisticsLog, AttemptRecord
+from keystroke_recording import KeystrokeRecording
+from symbol_statistics import SymbolStatistics
+from constraints import limits, texts
+
+
+class AttemptsSummary(NamedTuple):
+    """
+    AttemptsSummary is the summary of the attempts shown on the statistics page
+
+    Attributes:
+        attempts (int): number of attempts
+        best_speed (float): the best speed in Words Per Minute, 0 if there are no attempts
+        recent_speed (float): mean speed of the last attempts, 0 if there are no attempts
+        recent_accuracy (float): share of correct types in the last attempts, -1 if there were no types
+    """
+    attempts: int
+    best_speed: float
+    recent_speed: float
+    recent_accuracy: float
+
+
+class LevelResult(NamedTuple):
+    """
+    LevelResult is the summary of the attempts of one level
+
+    Attributes:
+        level_id (str): identifier of the level
+        attempts (int): number of attempts
+        best_speed (float): the best speed in Words Per Minute
+        best_accuracy (float): the best accuracy
+        last_time_stamp (float): the moment of the last attempt, seconds since the epoch
+    """
+    level_id: str
+    attempts: int
+    best_speed: float
+    best_accuracy: float
+    last_time_stamp: float
+
+
+class AttemptStore:
+    """
+    AttemptStore is a SQLite database of the attempts and the outcomes of every symbol in them, used for queries
+    The statistics log stays the source of the data: the store remembers the size of the log it has imported
+    and imports only the records appended after it, so the store is rebuilt from the log if it is lost
+    The database is in WAL mode, so the page queries are not blocked by the writer thread,
+    every thread uses its own connection. The results of every level are kept up to date on insert,
+    so the summaries do not scan the attempts. The keystroke recordings are kept with the hash of their text
+
+    Parameters:
+        file_path (str): path to the database file
+
+    Attributes:
+        file_path (str)
+        local (threading.local): the connection of each thread
+    """
+    VERSION = 1
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS attempts (
+            id INTEGER PRIMARY KEY,
+            level_id TEXT NOT NULL,
+            time_stamp REAL NOT NULL,
+            speed REAL,
+            accuracy REAL
+        );
+        CREATE TABLE IF NOT EXISTS symbol_outcomes (
+            attempt_id INTEGER NOT NULL REFERENCES attempts(id),
+            symbol TEXT NOT NULL,
+            hits INTEGER NOT NULL,
+            misses INTEGER NOT NULL,
+            PRIMARY KEY (attempt_id, symbol)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS level_results (
+            level_id TEXT PRIMARY KEY,
+            attempts INTEGER NOT NULL,
+            best_speed REAL NOT NULL,
+            best_accuracy REAL NOT NULL,
+            last_time_stamp REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS recordings (
+            attempt_id INTEGER PRIMARY KEY REFERENCES attempts(id),
+            content_hash BLOB NOT NULL,
+            data BLOB NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value
+        );
+        CREATE INDEX IF NOT EXISTS attempts_by_level ON attempts (level_id, time_stamp);
+        CREATE INDEX IF NOT EXISTS attempts_by_time ON attempts (time_stamp, speed);
+        CREATE INDEX IF NOT EXISTS outcomes_by_symbol ON symbol_outcomes (symbol, attempt_id);
+    '''
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.local = threading.local()
+        connection = self.get_connection()
+        with connection:
+            connection.executescript(self.SCHEMA)
+            connection.execute(f'PRAGMA user_version = {self.VERSION}')
+
+    @classmethod
+    def open(cls, file_path: str) -> 'AttemptStore | None':
+        """
+        Opens the store, creates the database if there is none
+        Parameters:
+            file_path (str): path to the database file
+        Returns:
+            store (AttemptStore | None): None in case sqlite3 is not available or the database can not be opened
+        """
+        if sqlite3 is None:
+            return None
+        try:
+            return cls(file_path)
+        except sqlite3.Error:
+            return None
+
+    def get_connection(self) -> 'sqlite3.Connection':
+        """
+        Returns the connection of the current thread, opens it on the first call
+        Returns:
+            connection (sqlite3.Connection)
+        """
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.file_path)
+            connection.execute('PRAGMA journal_mode = WAL')
+            connection.execute('PRAGMA synchronous = NORMAL')
+            self.local.connection = connection
+        return connection
+
+    def close(self) -> None:
+        """
+        Closes the connection of the current thread
+        """
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+    @staticmethod
+    def get_meta(connection: 'sqlite3.Connection', key: str, default=None):
+        """
+        Returns the value stored in the meta table
+        Parameters:
+            connection (sqlite3.Connection): the connection to use
+            key (str): the key of the value
+            default: the value to return in case there is no such key
+        """
+        row = connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return default if row is None else row[0]
+
+    @staticmethod
+    def set_meta(connection: 'sqlite3.Connection', key: str, value) -> None:
+        """
+        Stores the value in the meta table
+        Parameters:
+            connection (sqlite3.Connection): connection with an open transaction
+            key (str): the key of the value
+            value: the value
+        """
+        connection.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    @staticmethod
+    def insert(connection: 'sqlite3.Connection', records: list[AttemptRecord]) -> None:
+        """
+        Inserts the attempts, their symbol outcomes and recordings with one batch per table, updates the level results
+        Parameters:
+            connection (sqlite3.Connection): connection with an open transaction
+            records (list[AttemptRecord]): attempts to insert
+        """
+        (next_id,) = connection.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM attempts').fetchone()
+        attempts = []
+        outcomes = []
+        recordings = []
+        results = {}
+        for attempt_id, record in enumerate(records, next_id):
+            attempts.append((attempt_id, record.level_id, record.time_stamp, record.speed, record.accuracy))
+            if record.speed is not None:
+                result = results.get(record.level_id)
+                results[record.level_id] = LevelResult(record.level_id, 1, record.speed, record.accuracy,
+                                                       record.time_stamp) if result is None else \
+                    LevelResult(record.level_id, result.attempts + 1, max(result.best_speed, record.speed),
+                                max(result.best_accuracy, record.accuracy),
+                                max(result.last_time_stamp, record.time_stamp))
+            for symbol in record.letter_counter.keys() | record.mistakes_counter.keys():
+                outcomes.append((attempt_id, symbol, record.letter_counter[symbol], record.mistakes_counter[symbol]))
+            if record.recording:
+                try:
+                    recordings.append((attempt_id, KeystrokeRecording.read_content_hash(record.recording),
+                                       record.recording))
+                except ValueError:  # written by a newer version
+                    pass
+        connection.executemany('INSERT INTO attempts (id, level_id, time_stamp, speed, accuracy) '
+                               'VALUES (?, ?, ?, ?, ?)', attempts)
+        connection.executemany('INSERT INTO symbol_outcomes (attempt_id, symbol, hits, misses) '
+                               'VALUES (?, ?, ?, ?)', outcomes)
+        connection.executemany('INSERT INTO recordings (attempt_id, content_hash, data) VALUES (?, ?, ?)', recordings)
+        connection.executemany('INSERT INTO level_results VALUES (?, ?, ?, ?, ?) ON CONFLICT (level_id) DO UPDATE '
+                               'SET attempts = attempts + excluded.attempts, '
+                               'best_speed = MAX(best_speed, excluded.best_speed), '
+                               'best_accuracy = MAX(best_accuracy, excluded.best_accuracy), '
+                               'last_time_stamp = MAX(last_time_stamp, excluded.last_time_stamp)', results.values())
+
+    def import_pickle(self, file_path: str) -> bool:
+        """
+        Imports the totals stored with pickle by the older versions as one attempt without speed and accuracy,
+        does nothing if they were imported before
+        Parameters:
+            file_path (str): path to the pickle file
+        Returns:
+            success (bool): False in case the database could not be written
+        """
+        try:
+            connection = self.get_connection()
+            if self.get_meta(connection, 'pickle_imported'):
+                return True
+            try:
+                with open(file_path, 'rb') as file:
+                    mistakes_counter, letter_counter = pickle.load(file)[:2]
+            except (FileNotFoundError, AttributeError, EOFError, ImportError, IndexError, TypeError, ValueError):
+                mistakes_counter, letter_counter = Counter(), Counter()
+            with connection:
+                if letter_counter or mistakes_counter:
+                    self.insert(connection, [AttemptRecord(texts.LEGACY_LEVEL_ID, 0.0, None, None,
+                                                           Counter(letter_counter), Counter(mistakes_counter))])
+                self.set_meta(connection, 'pickle_imported', 1)
+        except sqlite3.Error:
+            return False
+        return True
+
+    def import_log(self, log: StatisticsLog) -> bool:
+        """
+        Imports the records appended to the log since the last import in one transaction
+        In case the log is smaller than the imported part, it was replaced, so the store is filled from scratch
+        Parameters:
+            log (StatisticsLog): the log to import
+        Returns:
+            success (bool): False in case the database could not be written
+        """
+        try:
+            connection = self.get_connection()
+            start = self.get_meta(connection, 'log_size', 0)
+            with connection:
+                if log.get_size() < start:
+                    connection.execute('DELETE FROM symbol_outcomes WHERE attempt_id IN '
+                                       '(SELECT id FROM attempts WHERE level_id != ?)', (texts.LEGACY_LEVEL_ID,))
+                    connection.execute('DELETE FROM recordings')
+                    connection.execute('DELETE FROM attempts WHERE level_id != ?', (texts.LEGACY_LEVEL_ID,))
+                    connection.execute('DELETE FROM level_results')
+                    start = 0
+                records = log.read(start)
+                while batch := list(islice(records, limits.STORE_BATCH_SIZE)):
+                    self.insert(connection, batch)
+                self.set_meta(connection, 'log_size', log.get_size())
+        except sqlite3.Error:
+            return False
+        return True
+
+    def get_summary(self, recent: int = limits.RECENT_ATTEMPTS) -> AttemptsSummary:
+        """
+        Returns the summary of all the attempts and the last ones
+        Parameters:
+            recent (int): number of the last attempts to average
+        Returns:
+            summary (AttemptsSummary)
+        """
+        connection = self.get_connection()
+        attempts, best_speed = connection.execute(
+            'SELECT COALESCE(SUM(attempts), 0), COALESCE(MAX(best_speed), 0) FROM level_results').fetchone()
+        (recent_speed,) = connection.execute(
+            'SELECT COALESCE(AVG(speed), 0) FROM (SELECT speed FROM attempts WHERE speed IS NOT NULL '
+            'ORDER BY time_stamp DESC LIMIT ?)', (recent,)).fetchone()
+        hits, misses = connection.execute(
+            'SELECT COALESCE(SUM(hits), 0), COALESCE(SUM(misses), 0) FROM symbol_outcomes WHERE attempt_id IN '
+            '(SELECT id FROM attempts WHERE speed IS NOT NULL ORDER BY time_stamp DESC LIMIT ?)', (recent,)).fetchone()
+        recent_accuracy = hits / (hits + misses) if hits + misses else -1
+        return AttemptsSummary(attempts, best_speed, recent_speed, recent_accuracy)
+
+    def get_level_results(self) -> dict[str, LevelResult]:
+        """
+        Returns the summary of the attempts of every level attempted
+        Returns:
+            results (dict[str, LevelResult]): the results by level identifier
+        """
+        rows = self.get_connection().execute('SELECT * FROM level_results')
+        return {row[0]: LevelResult(*row) for row in rows}
+
+    def get_level_attempts(self, level_id: str) -> list[tuple[float, float]]:
+        """
+        Returns the results of all the attempts of the level
+        Parameters:
+            level_id (str): identifier of the level
+        Returns:
+            attempts (list[tuple[float, float]]): the speed and the accuracy of each attempt
+        """
+        return self.get_connection().execute(
+            'SELECT speed, accuracy FROM attempts WHERE level_id = ? AND speed IS NOT NULL', (level_id,)).fetchall()
+
+    def get_best_recording(self, level_id: str, content_hash: bytes) -> bytes | None:
+        """
+        Returns the recording of the fastest attempt of the level typed on the same text
+        Parameters:
+            level_id (str): identifier of the level
+            content_hash (bytes): the hash of the text of the level, see KeystrokeRecording.get_content_hash
+        Returns:
+            recording (bytes | None): the encoded KeystrokeRecording, None in case there is none
+        """
+        row = self.get_connection().execute(
+            'SELECT data FROM attempts JOIN recordings ON recordings.attempt_id = attempts.id '
+            'WHERE level_id = ? AND content_hash = ? ORDER BY speed DESC LIMIT 1', (level_id, content_hash)).fetchone()
+        return None if row is None else row[0]
+
+    def get_recordings(self, limit: int) -> list[tuple[str, bytes]]:
+        """
+        Returns the recordings of the last attempts from the newest to the oldest
+        Parameters:
+            limit (int): maximal number of recordings
+        Returns:
+            recordings (list[tuple[str, bytes]]): the level identifier and the encoded KeystrokeRecording of each one
+        """
+        return self.get_connection().execute(
+            'SELECT level_id, data FROM attempts JOIN recordings ON recordings.attempt_id = attempts.id '
+            'ORDER BY attempts.id DESC LIMIT ?', (limit,)).fetchall()
+
+    def get_symbol_statistics(self, limit: int = limits.HISTORY_LENGTH) -> SymbolStatistics:
+        """
+        Returns the statistics of the last attempts with their history, for the trend queries
+        Parameters:
+            limit (int): maximal number of attempts
+        Returns:
+            statistics (SymbolStatistics): the totals and the history of the attempts from the oldest to the newest
+        """
+        rows = self.get_connection().execute(
+            'SELECT last.id, symbol, hits, misses FROM (SELECT id FROM attempts ORDER BY id DESC LIMIT ?) AS last '
+            'LEFT JOIN symbol_outcomes ON attempt_id = last.id ORDER BY last.id', (limit,))
+        statistics = SymbolStatistics()
+        for _, outcomes in groupby(rows, itemgetter(0)):
+            letter_counter, mistakes_counter = Counter(), Counter()
+            for _, symbol, hits, misses in outcomes:
+                if symbol is not None:
+                    letter_counter[symbol] = hits
+                    mistakes_counter[symbol] = misses
+            statistics.add(letter_counter, mistakes_counter)
+        return statistics
+
+    def get_speed_history(self, level_id: str | None = None, limit: int = limits.HISTORY_LENGTH
+                          ) -> list[tuple[float, float]]:
+        """
+        Returns the speed of the last attempts from the oldest to the newest
+        Parameters:
+            level_id (str | None): the level to take the attempts of, all the levels by default
+            limit (int): maximal number of attempts
+        Returns:
+            history (list[tuple[float, float]]): the moment and the speed of each attempt
+        """
+        if level_id is None:
+            rows = self.get_connection().execute(
+                'SELECT time_stamp, speed FROM attempts WHERE speed IS NOT NULL ORDER BY time_stamp DESC LIMIT ?',
+                (limit,))
+        else:
+            rows = self.get_connection().execute(
+                'SELECT time_stamp, speed FROM attempts WHERE level_id = ? ORDER BY time_stamp DESC LIMIT ?',
+                (level_id, limit))
+        return rows.fetchall()[::-1]
+
+    def get_symbol_history(self, symbol: str, limit: int = limits.HISTORY_LENGTH) -> list[tuple[int, int]]:
+        """
+        Returns the outcomes of the symbol in the last attempts it was typed in, from the oldest to the newest
+        Parameters:
+            symbol (str): the symbol
+            limit (int): maximal number of attempts
+        Returns:
+            history (list[tuple[int, int]]): correct types and mistakes in each attempt
+        """
+        rows = self.get_connection().execute(
+            'SELECT hits, misses FROM symbol_outcomes WHERE symbol = ? ORDER BY attempt_id DESC LIMIT ?',
+            (symbol, limit))
+        return rows.fetchall()[::-1]
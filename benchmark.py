@@ -0,0 +1,261 @@
+import os
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6 import QtWidgets as qtw, QtCore as qtc, QtGui as qtg
+from __feature__ import snake_case, true_property
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from level_catalog import Level, LevelCatalog
+from key_timings import KeyTimings
+from keystroke_recording import KeystrokeRecording
+from attempt_store import AttemptStore
+from profile_manager import ProfileManager
+from streamed_text import StreamedText
+from typing_page import Typer
+from constraints import texts
+
+
+def make_text(words: list[str], length: int, rng: random.Random) -> str:
+    """
+    Generates a text of random words with line breaks
+    Parameters:
+        words (list[str]): words to take
+        length (int): the length of the text
+        rng (random.Random): random generator
+    Returns:
+        text (str)
+    """
+    parts = []
+    size = 0
+    line = 0
+    while size < length:
+        word = rng.choice(words)
+        line += len(word) + 1
+        separator = '\n' if line > 70 else ' '
+        if separator == '\n':
+            line = 0
+        parts.append(word + separator)
+        size += len(word) + 1
+    return ''.join(parts)[:length]
+
+
+def make_keystrokes(text: str, mistake_rate: float, rng: random.Random) -> list[str]:
+    """
+    Generates a stream of typed symbols for the text, a wrong symbol is typed before some of the symbols
+    The last symbol is not typed, so the level is not finished and the statistics are not saved
+    Parameters:
+        text (str): the text to type
+        mistake_rate (float): the probability of a mistake before each symbol
+        rng (random.Random): random generator
+    Returns:
+        keystrokes (list[str])
+    """
+    keystrokes = []
+    for symbol in text[:-1]:
+        if rng.random() < mistake_rate:
+            keystrokes.append('#' if symbol != '#' else '@')
+        keystrokes.append(symbol)
+    return keystrokes
+
+
+def make_replay_keystrokes(text: str | StreamedText, data: bytes) -> list[str]:
+    """
+    Groups the keystrokes of the recording into the input events they were typed by
+    The keystroke typing the last symbol is dropped, so the level is not finished and the statistics are not saved
+    Parameters:
+        text (str | StreamedText): the text the recording was typed on
+        data (bytes): the encoded KeystrokeRecording
+    Returns:
+        keystrokes (list[str]): symbols typed by each event
+    """
+    keystrokes = []
+    progress = 0
+    last_time_stamp = None
+    for symbol, time_stamp in KeystrokeRecording.iterate_keystrokes(data):
+        if symbol == text[progress]:
+            if progress == len(text) - 1:
+                break
+            progress += 1
+        if time_stamp == last_time_stamp:
+            keystrokes[-1] += symbol
+        else:
+            keystrokes.append(symbol)
+        last_time_stamp = time_stamp
+    return keystrokes
+
+
+def load_recordings(paths: list[str], levels: list[Level], limit: int) -> list[tuple[str, Level, bytes]]:
+    """
+    Reads the recordings and finds the levels they were typed on by the hash of the text,
+    the recordings of the levels which were removed or changed since are skipped
+    Parameters:
+        paths (list[str]): attempt databases and files of encoded recordings,
+                           the database of the active profile in case there are none
+        levels (list[Level]): the levels of the catalog
+        limit (int): maximal number of recordings taken from each database
+    Returns:
+        recordings (list[tuple[str, Level, bytes]]): the source, the level and the encoded recording of each one,
+                                                     the source is the level identifier or the file path
+    """
+    if not paths:
+        paths = [os.path.join(ProfileManager.get_directory(ProfileManager().active), texts.STATISTICS_DATABASE_FILE)]
+    sources = []
+    for path in paths:
+        if path.endswith('.sqlite3'):
+            store = AttemptStore.open(path) if os.path.exists(path) else None
+            if store is None:
+                print(f'Can not open attempt database {path}', file=sys.stderr)
+                continue
+            sources.extend(store.get_recordings(limit))
+            store.close()
+        else:
+            with open(path, 'rb') as file:
+                sources.append((path, file.read()))
+    by_hash = {KeystrokeRecording.get_content_hash(level.text): level for level in levels}
+    recordings = []
+    for name, data in sources:
+        try:
+            level = by_hash.get(KeystrokeRecording.read_content_hash(data))
+        except ValueError:
+            level = None
+        if level is None:
+            print(f'Skipping recording {name}: its level is not found', file=sys.stderr)
+            continue
+        recordings.append((name, level, data))
+    return recordings
+
+
+def make_events(keystrokes: list[str]) -> list[qtg.QKeyEvent]:
+    """
+    Creates the key press events for the symbols, several symbols make one compressed event
+    Parameters:
+        keystrokes (list[str]): symbols typed by each event
+    Returns:
+        events (list[QKeyEvent])
+    """
+    events = {}
+    for symbols in set(keystrokes):
+        key = qtc.Qt.Key_Return if symbols == '\n' * len(symbols) else qtc.Qt.Key_A
+        events[symbols] = qtg.QKeyEvent(qtc.QEvent.KeyPress, key, qtc.Qt.NoModifier, symbols, False, len(symbols))
+    return [events[symbols] for symbols in keystrokes]
+
+
+def run_typer(app: qtw.QApplication, text: str, events: list[qtg.QKeyEvent]) -> tuple[float, list[int]]:
+    """
+    Creates a shown Typer for the text and feeds the events to it, processing the Qt events after each one
+    Parameters:
+        app (QApplication): the application
+        text (str): the text to type
+        events (list[QKeyEvent]): the key events
+    Returns:
+        build_time (float): time of Typer creation in milliseconds
+        latencies (list[int]): time of each keystroke in nanoseconds
+    """
+    start = time.perf_counter_ns()
+    typer = Typer(text, 'benchmark', 80, 0.95)
+    typer.show()
+    app.process_events()
+    build_time = (time.perf_counter_ns() - start) / 10 ** 6
+    latencies = []
+    for event in events:
+        start = time.perf_counter_ns()
+        typer.key_press_event(event)
+        app.process_events()
+        latencies.append(time.perf_counter_ns() - start)
+    typer.close()
+    typer.delete_later()
+    app.process_events()
+    return build_time, latencies
+
+
+def run_case(app: qtw.QApplication, name: str, text: str | StreamedText, keystrokes: list[str],
+             args: argparse.Namespace) -> dict:
+    """
+    Benchmarks typing of the text: speed in the first run, memory in the second one
+    Returns:
+        report (dict): JSON-serializable report of the case
+    """
+    events = make_events(keystrokes)
+    build_time, latencies = run_typer(app, text, events)
+    total = sum(latencies)
+    latencies.sort()
+    report = {
+        'name': name,
+        'length': len(text),
+        'keystrokes': len(events),
+        'build_ms': round(build_time, 3),
+        'total_ms': round(total / 10 ** 6, 3),
+        'latency_us': {
+            'mean': round(total / max(1, len(latencies)) / 1000, 3),
+            'p50': round(KeyTimings.percentile(latencies, 0.5) / 1000, 3),
+            'p95': round(KeyTimings.percentile(latencies, 0.95) / 1000, 3),
+            'p99': round(KeyTimings.percentile(latencies, 0.99) / 1000, 3),
+            'max': round(latencies[-1] / 1000, 3),
+        } if latencies else {},
+    }
+    if not args.no_memory:
+        tracemalloc.start()
+        run_typer(app, text, events)
+        report['peak_python_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Benchmarks the Typer input path on levels, generated texts and recorded attempts')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[10000, 50000, 100000],
+                        help='lengths of generated texts')
+    parser.add_argument('--mistake-rate', type=float, default=0.05, help='probability of a mistake before a symbol')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--no-levels', action='store_true', help='skip the levels from the levels directory')
+    parser.add_argument('--no-memory', action='store_true', help='skip the memory measuring runs')
+    parser.add_argument('--recordings', nargs='*', metavar='PATH',
+                        help='replay the recorded attempts from attempt databases (*.sqlite3) and files '
+                             'of recordings, from the database of the active profile in case no path is given')
+    parser.add_argument('--recordings-limit', type=int, default=10,
+                        help='maximal number of the last recordings taken from each database')
+    parser.add_argument('--output', help='file to write the JSON report to, standard output by default')
+    args = parser.parse_args()
+
+    app = qtw.QApplication(sys.argv[:1])
+    rng = random.Random(args.seed)
+    catalog = LevelCatalog()
+    levels = [level for level in map(catalog.get_level, catalog.get_paths()) if level is not None]
+    cases = []
+    if not args.no_levels:
+        for level in levels:
+            cases.append(run_case(app, level.path, level.text,
+                                  make_keystrokes(level.text, args.mistake_rate, rng), args))
+    if args.recordings is not None:
+        for name, level, data in load_recordings(args.recordings, levels, args.recordings_limit):
+            cases.append(run_case(app, f'recording-{name}', level.text,
+                                  make_replay_keystrokes(level.text, data), args))
+    words = sorted({word for level in levels for word in level.text[:].split()})
+    for size in args.sizes:
+        text = make_text(words, size, rng)
+        cases.append(run_case(app, f'generated-{size}', text, make_keystrokes(text, args.mistake_rate, rng), args))
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'qt_platform': os.environ['QT_QPA_PLATFORM'],
+        'time_stamp': time.time(),
+        'cases': cases,
+    }
+    data = json.dumps(report, indent=2)
+    if args.output is None:
+        print(data)
+    else:
+        with open(args.output, 'w') as file:
+            file.write(data + '\n')
+
+
+if __name__ == '__main__':
+    main()
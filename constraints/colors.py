@@ -4,5 +4,7 @@ RED_COLOR = "#990d35"
 RED_COLOR_RGB = (153, 13, 53)
 GRAY_COLOR = "#69747c"
 DARK_GRAY_COLOR = "#071108"
+DARK_GRAY_COLOR_RGB = (7, 17, 8)
 BACKGROUND_COLOR = "#303030"
 WHITE_COLOR = "#faf6f6"
+GHOST_COLOR = "#b4d2f0"
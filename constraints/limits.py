@@ -0,0 +1,34 @@
+KEY_EVENTS_BUFFER_SIZE = 4096
+RECORDING_BUFFER_SIZE = 4096  # keystrokes an attempt recording has room for before its buffers grow
+STREAMED_LEVEL_SIZE = 1 << 16
+STREAMED_TEXT_CHUNK_SIZE = 1 << 14
+WINDOW_LENGTH = 4000
+WINDOW_MARGIN = 1000
+MIN_GOAL_SPEED = 1
+MAX_GOAL_SPEED = 250
+MAX_HEADER_LINE_LENGTH = 1000
+VALIDATOR_CHUNK_SIZE = 1 << 16
+SPEED_WINDOW = 5  # seconds
+SPEEDOMETER_RATE = 10  # updates per second
+GHOST_RATE = 30  # ghost moves per second
+SNAPSHOT_INTERVAL = 50  # records written to the log between snapshots
+DRILL_WORDS = 60
+DRILL_LINE_LENGTH = 60
+DRILL_KEYS = 8  # the weakest symbols and bigrams a drill is made of
+DRILL_MIN_SAMPLES = 3  # timed types of a key needed to trust its latency
+DRILL_MISS_BASE = 0.05  # keeps slow keys without mistakes in drills
+DRILL_CORPUS_LENGTH = 1 << 20  # symbols of each level used to make drills
+DRILL_GOAL_SPEED = 40
+DRILL_GOAL_ACCURACY = 0.95
+STORE_BATCH_SIZE = 1000  # records inserted to the database at once
+STORE_POLL_INTERVAL = 200  # milliseconds between checks whether the database is imported
+RECENT_ATTEMPTS = 10
+HISTORY_LENGTH = 100
+PROFILE_CACHE_SIZE = 3  # profiles kept loaded
+INDEX_TEXT_LENGTH = 1 << 20  # symbols of each level searched for words
+INDEX_MIN_DOCUMENTS = 64  # the index is rebuilt only when it has more removed documents
+PACK_PARALLEL_MIN = 64  # levels of a pack checked without starting worker processes
+PACK_TASKS_PER_WORKER = 16  # chunks of levels sent to each worker, balances load against transfer overhead
+SHIFT_EFFORT = 1.0  # extra keystroke of the symbols typed with shift, used to estimate difficulty
+NUMBER_ROW_EFFORT = 0.5  # extra reach of the symbols of the number row
+RECOMMENDED_LEVELS = 5  # levels training the weakest symbols offered after a level
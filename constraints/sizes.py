@@ -8,3 +8,5 @@ SCORE_WINDOW_WIDTH = 350
 SCORE_WINDOW_HEIGHT = 150
 BUTTON_SIZE = 50
 KEY_SIZE = 50
+LEVEL_CELL_SIZE = 60
+SEARCH_WIDTH = 300
@@ -54,3 +54,4 @@ SHIFT_BUTTON_LOCATION = (45, 260)
 HEADER_LOCATION = (100, 100)
 GREEN_MIN_ACCURACY = 1
 RED_MAX_ACCURACY = 0.7
+SYMBOLS = ''.join(map(chr, range(32, 127))) + '\n\t'
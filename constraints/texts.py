@@ -4,23 +4,66 @@ HOME_BUTTON = 'HOME'
 LEVELS_BUTTON = 'LEVELS'
 STATISTICS_BUTTON = 'STATISTICS'
 UPLOAD_BUTTON = 'UPLOAD'
+NEW_PROFILE_BUTTON = '+'
+DRILL_BUTTON = 'DRILL'
 RESTART_BUTTON = 'RESTART'
 NEXT_BUTTON = 'NEXT'
+NEXT_LEVEL_TEXT = 'Next: {}'
+RECOMMENDED_LEVEL_TEXT = 'Practice: {}'
 
 LEVELS_HEADER = 'Levels'
+ALL_LEVELS_GROUP = 'All'
+OTHER_LEVELS_GROUP = 'Other'
+SEARCH_PLACEHOLDER = 'Search: words has:{; only:asdf len<400'
 UPLOAD_HEADER = 'Upload Level'
 STATISTICS_HEADER = 'Statistics'
+DRILL_HEADER = 'Drill: {}'
+DRILL_RANDOM_HEADER = 'Drill'
 
 SPEED_TEXT = 'SPEED'
 SPEED_RESOLUTION = 'WPM'
+ROLLING_SPEED_TEXT = 'LAST {} S'
 ACCURACY_TEXT = 'ACCURACY'
 ACCURACY_RESOLUTION = '%'
+GHOST_TEXT = 'GHOST'
 
 NO_DATA_TEXT = 'NO DATA'
+PROFILE_TEXT = 'PROFILE'
+NEW_PROFILE_TEXT = 'Name of the new profile:'
+ATTEMPTS_TEXT = 'ATTEMPTS'
+BEST_SPEED_TEXT = 'BEST'
+RECENT_TEXT = 'LAST {}'
+
+NEWLINE_GLYPH = '↵'
+TAB_GLYPH = ' ⇥ '
 
 ERROR_INVALID_FILE = 'This file is not valid!'
+ERROR_PROFILE_NAME = 'Profile name should be 1 to 32 English letters, digits, - or _'
+ERROR_NO_DRILL = 'There are no levels to make a drill of'
+ERROR_UNREADABLE_FILE = 'The file can not be read as text'
+ERROR_LONG_LINE = 'The line is too long'
+ERROR_NO_GOALS = 'The second line should contain goal speed and goal accuracy'
+ERROR_GOAL_SPEED = 'Goal speed should be a real number from 1 to 250'
+ERROR_GOAL_ACCURACY = 'Goal accuracy should be a real number greater than 0 and not greater than 1'
+ERROR_EMPTY_TEXT = 'The text of the level is empty'
+ERROR_INVALID_SYMBOL = 'Symbol {} is not supported'
+LINE_TEXT = 'Line'
+COLUMN_TEXT = 'column'
 
 INSTRUCTION_PATH = 'constraints/instruction.html'
 STATISTICS_PATH = 'saves/stats.pickle'
+STATISTICS_LOG_FILE = 'stats.log'
+STATISTICS_SNAPSHOT_FILE = 'stats.snapshot'
+STATISTICS_DATABASE_FILE = 'stats.sqlite3'
+SAVES_DIRECTORY = 'saves'
+PROFILES_DIRECTORY = 'saves/profiles'
+ACTIVE_PROFILE_PATH = 'saves/profile.txt'
+DEFAULT_PROFILE = 'default'
+LEVELS_DIRECTORY = 'levels'
+LEVEL_BUNDLE_PATH = 'levels/levels.bundle'
+LEVEL_INDEX_PATH = 'saves/levels.index'
+LEVEL_MATRIX_PATH = 'saves/levels.matrix.npz'
+DRILL_LEVEL_ID = 'drill'
+LEGACY_LEVEL_ID = 'legacy'
 LEVEL_PATH_FIRST = 'levels/level'
 LEVEL_PATH_LAST = '.txt'
@@ -0,0 +1,140 @@
+import heapq
+import random
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from itertools import accumulate
+from types import MappingProxyType
+
+from singleton import Singleton
+from level_catalog import Level, LevelCatalog
+from statistics_calculator import StatisticsCalculator
+from profile_manager import ProfileManager
+from constraints import limits, texts
+
+
+class NgramIndex:
+    """
+    NgramIndex maps every symbol and bigram to the words containing it, so a word containing a key is sampled
+    with a binary search instead of scanning the texts
+    A word is sampled with the probability proportional to the number of occurrences of the key in it
+
+    Parameters:
+        words (Iterable[str]): words of the corpus, repeated words are indexed once
+
+    Attributes:
+        words (list[str]): distinct words
+        postings (dict[str, tuple[array[int], list[int]]]): for every key, the indices of the words containing it
+                                                            and the prefix sums of the occurrences
+    """
+    def __init__(self, words):
+        self.words = list(dict.fromkeys(words))
+        postings = {}
+        for i, word in enumerate(self.words):
+            keys = Counter(word)
+            keys.update(word[j:j + 2] for j in range(len(word) - 1))
+            for key, count in keys.items():
+                indices, weights = postings.setdefault(key, ([], []))
+                indices.append(i)
+                weights.append(count)
+        self.postings = {key: (array('l', indices), list(accumulate(weights)))
+                         for key, (indices, weights) in postings.items()}
+
+    def sample(self, key: str, rng: random.Random) -> str:
+        """
+        Returns a random word containing the key
+        Parameters:
+            key (str): symbol or bigram, should be in the index
+            rng (random.Random): random generator
+        Returns:
+            word (str)
+        """
+        indices, prefix_sums = self.postings[key]
+        return self.words[indices[bisect_right(prefix_sums, rng.random() * prefix_sums[-1])]]
+
+
+class DrillGenerator(metaclass=Singleton):
+    """
+    DrillGenerator makes practice levels of the words containing the weakest symbols and bigrams of the active profile
+    The index of the words of all the levels in the levels directory is built on first use
+    Does not take any parameters
+
+    Attributes:
+        index (NgramIndex | None): the index of the words, None before the first use
+        rng (random.Random): random generator
+    """
+    def __init__(self):
+        self.index = None
+        self.rng = random.Random()
+
+    def get_index(self) -> NgramIndex:
+        """
+        Returns the index of the words of the levels, builds it on the first call
+        Returns:
+            index (NgramIndex)
+        """
+        if self.index is None:
+            catalog = LevelCatalog()
+            levels = (catalog.get_level(path) for path in catalog.get_paths())
+            self.index = NgramIndex(word for level in levels if level is not None
+                                    for word in level.text[:limits.DRILL_CORPUS_LENGTH].split())
+        return self.index
+
+    @staticmethod
+    def get_weak_keys(keys: list[str], calculator: StatisticsCalculator) -> list[tuple[str, float]]:
+        """
+        Scores the keys by the miss rate of their last symbol and by their latency relative to the mean symbol
+        latency, returns the weakest ones. Keys never typed are skipped
+        Parameters:
+            keys (list[str]): symbols and bigrams to score
+            calculator (StatisticsCalculator): the statistics of the user
+        Returns:
+            weak_keys (list[tuple[str, float]]): at most limits.DRILL_KEYS keys with their positive scores
+        """
+        symbol_latencies = [calculator.get_latency(key) for key in keys
+                            if len(key) == 1 and calculator.latency_count[key] >= limits.DRILL_MIN_SAMPLES]
+        mean_latency = sum(symbol_latencies) / len(symbol_latencies) if symbol_latencies else 0
+        scores = []
+        for key in keys:
+            miss_rate = calculator.get_miss_rate(key[-1])
+            if miss_rate == -1:
+                continue
+            score = limits.DRILL_MISS_BASE + miss_rate
+            if mean_latency and calculator.latency_count[key] >= limits.DRILL_MIN_SAMPLES:
+                score *= calculator.get_latency(key) / mean_latency
+            elif len(key) == 2:  # bigrams are only drilled for being slow
+                continue
+            scores.append((key, score))
+        return heapq.nlargest(limits.DRILL_KEYS, scores, key=lambda item: item[1])
+
+    def generate(self) -> Level | None:
+        """
+        Makes a drill level: every word contains one of the weak keys chosen with the probability
+        proportional to its score. Without statistics the keys are chosen among all the symbols
+        Returns:
+            level (Level | None): the level, None in case there are no words to make it of
+        """
+        index = self.get_index()
+        if not index.words:
+            return None
+        weak_keys = self.get_weak_keys(list(index.postings), ProfileManager().get_calculator())
+        if weak_keys:
+            title = texts.DRILL_HEADER.format(' '.join(key for key, _ in weak_keys))
+        else:
+            title = texts.DRILL_RANDOM_HEADER
+            weak_keys = [(key, 1.0) for key in index.postings if len(key) == 1]
+        keys = [key for key, _ in weak_keys]
+        prefix_scores = list(accumulate(score for _, score in weak_keys))
+        lines = [[]]
+        line_length = 0
+        for _ in range(limits.DRILL_WORDS):
+            key = keys[bisect_right(prefix_scores, self.rng.random() * prefix_scores[-1])]
+            word = index.sample(key, self.rng)
+            if line_length + len(word) > limits.DRILL_LINE_LENGTH and lines[-1]:
+                lines.append([])
+                line_length = 0
+            lines[-1].append(word)
+            line_length += len(word) + 1
+        text = '\n'.join(map(' '.join, lines))
+        return Level(texts.DRILL_LEVEL_ID, title, limits.DRILL_GOAL_SPEED, limits.DRILL_GOAL_ACCURACY,
+                     text, MappingProxyType(Counter(text)))
@@ -3,3 +3,4 @@
 python3 -m venv venv
 source venv/bin/activate
 python -m pip install -r requirements.txt
+python level_bundle.py
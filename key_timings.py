@@ -0,0 +1,178 @@
+import math
+from array import array
+from typing import NamedTuple
+
+
+class LatencyStats(NamedTuple):
+    """
+    LatencyStats is a summary of the time spent to type a symbol or a bigram, all times are in milliseconds
+
+    Attributes:
+        count (int): number of samples
+        mean (float): mean time
+        p50 (float): median time
+        p95 (float): 95th percentile of time
+    """
+    count: int
+    mean: float
+    p50: float
+    p95: float
+
+
+class KeyTimings:
+    """
+    KeyTimings is a ring buffer of key events, it keeps the last size events
+    Recording an event only writes two preallocated array cells
+
+    Parameters:
+        size (int): the capacity of the buffer
+
+    Attributes:
+        times (array[int]): time_ns of perf_counter of each event
+        targets (array[int]): the position in the text the event was typed at, ~position for mistakes
+        count (int): the number of events recorded since the start
+    """
+    def __init__(self, size: int):
+        self.times = array('q', bytes(8 * size))
+        self.targets = array('q', bytes(8 * size))
+        self.count = 0
+
+    def record(self, time_stamp: int, target: int, correct: bool) -> None:
+        """
+        Records the key event
+        Parameters:
+            time_stamp (int): perf_counter_ns of the event
+            target (int): position in the text the symbol was typed at
+            correct (bool): whether the symbol was right
+        """
+        index = self.count % len(self.times)
+        self.times[index] = time_stamp
+        self.targets[index] = target if correct else ~target
+        self.count += 1
+
+    def record_run(self, time_stamp: int, target: int, count: int) -> None:
+        """
+        Records the correct key events of count consecutive symbols typed at once
+        Parameters:
+            time_stamp (int): perf_counter_ns of the events
+            target (int): position in the text the first symbol was typed at
+            count (int): number of symbols
+        """
+        size = len(self.times)
+        for i in range(count):
+            index = (self.count + i) % size
+            self.times[index] = time_stamp
+            self.targets[index] = target + i
+        self.count += count
+
+    def events(self) -> list[tuple[int, int]]:
+        """
+        Returns the events kept in the buffer from the oldest to the newest
+        Returns:
+            events (list[tuple[int, int]]): pairs of time stamp and target
+        """
+        size = len(self.times)
+        first = max(0, self.count - size)
+        return [(self.times[i % size], self.targets[i % size]) for i in range(first, self.count)]
+
+    @staticmethod
+    def percentile(values: list[float], fraction: float) -> float:
+        """
+        Returns the nearest-rank percentile of sorted values
+        Parameters:
+            values (list[float]): sorted non-empty list
+            fraction (float): fraction from 0 to 1
+        Returns:
+            percentile (float)
+        """
+        return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+    @classmethod
+    def summarize(cls, samples: dict[str, list[float]]) -> dict[str, LatencyStats]:
+        """
+        Summarizes the samples of each key
+        Parameters:
+            samples (dict[str, list[float]]): times in milliseconds for each key
+        Returns:
+            stats (dict[str, LatencyStats])
+        """
+        stats = {}
+        for key, values in samples.items():
+            values.sort()
+            stats[key] = LatencyStats(len(values), sum(values) / len(values),
+                                      cls.percentile(values, 0.5), cls.percentile(values, 0.95))
+        return stats
+
+    def get_latency_stats(self, text: str) -> tuple[dict[str, LatencyStats], dict[str, LatencyStats]]:
+        """
+        Calculates the latency of every correctly typed symbol, the time passed since the previous correct type,
+        and groups it by symbols and by bigrams ending with the symbol. The symbols typed by one input event
+        after the first one are not timed
+        Parameters:
+            text (str): the typed text
+        Returns:
+            symbol_stats (dict[str, LatencyStats]), bigram_stats (dict[str, LatencyStats])
+        """
+        symbol_samples = {}
+        bigram_samples = {}
+        previous_time = None
+        for time_stamp, target in self.events():
+            if target < 0:
+                continue
+            if previous_time is not None and time_stamp != previous_time:
+                latency = (time_stamp - previous_time) / 10 ** 6
+                symbol_samples.setdefault(text[target], []).append(latency)
+                if target > 0:
+                    bigram_samples.setdefault(text[target - 1:target + 1], []).append(latency)
+            previous_time = time_stamp
+        return self.summarize(symbol_samples), self.summarize(bigram_samples)
+
+
+class RollingCounter:
+    """
+    RollingCounter counts the correct key events of KeyTimings made in the last window of time
+    It is updated incrementally: every event is added once when it is recorded and removed once when it gets
+    older than the window, so an update costs only the events came and left since the previous one
+
+    Parameters:
+        key_timings (KeyTimings): the events to count
+        window (int): the length of the window in nanoseconds
+
+    Attributes:
+        key_timings (KeyTimings)
+        window (int)
+        first (int): the number of the oldest event in the window
+        seen (int): the number of events added to the window
+        correct (int): the number of correct events in the window
+    """
+    def __init__(self, key_timings: KeyTimings, window: int):
+        self.key_timings = key_timings
+        self.window = window
+        self.first = 0
+        self.seen = 0
+        self.correct = 0
+
+    def update(self, time_stamp: int) -> int:
+        """
+        Moves the window so that it ends at time_stamp
+        Parameters:
+            time_stamp (int): perf_counter_ns of the current moment
+        Returns:
+            correct (int): the number of correct events in the window
+        """
+        timings = self.key_timings
+        size = len(timings.times)
+        lost = timings.count - size
+        if self.first < lost:  # the events were overwritten before leaving the window, count the kept ones again
+            self.first = self.seen = lost
+            self.correct = 0
+        for i in range(self.seen, timings.count):
+            if timings.targets[i % size] >= 0:
+                self.correct += 1
+        self.seen = timings.count
+        start = time_stamp - self.window
+        while self.first < self.seen and timings.times[self.first % size] <= start:
+            if timings.targets[self.first % size] >= 0:
+                self.correct -= 1
+            self.first += 1
+        return self.correct
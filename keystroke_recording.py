@@ -0,0 +1,260 @@
+import hashlib
+from array import array
+from collections.abc import Iterator
+
+from constraints import limits
+from streamed_text import StreamedText
+
+
+def encode_varint(value: int, buffer: bytearray) -> None:
+    """
+    Appends the non-negative number to the buffer as a varint: 7 bits in each byte from the lowest ones,
+    the high bit is set in all the bytes but the last
+    Parameters:
+        value (int): the number
+        buffer (bytearray): the buffer to append to
+    """
+    while value >= 0x80:
+        buffer.append(value & 0x7f | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def decode_varints(data: bytes | memoryview, offset: int, count: int) -> tuple[array, int]:
+    """
+    Reads the varints written by encode_varint
+    Parameters:
+        data (bytes | memoryview): the encoded data
+        offset (int): the position of the first varint
+        count (int): the number of varints to read
+    Raises:
+        IndexError: the data ends inside the varints
+    Returns:
+        values (array[int]): the numbers
+        offset (int): the position after the last varint
+    """
+    values = array('q', bytes(8 * count))
+    for i in range(count):
+        value = shift = 0
+        while True:
+            byte = data[offset]
+            offset += 1
+            value |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        values[i] = value
+    return values, offset
+
+
+class KeystrokeRecording:
+    """
+    KeystrokeRecording is the stream of the symbols typed in an attempt with the moments they were typed at
+    The moments are kept in milliseconds since the first keystroke, the symbols typed by one input event
+    share its moment. The recording knows the hash of the text it was typed on, so it is replayed only on the same text
+    Encoded layout:
+        version (uint8), content hash (HASH_SIZE bytes), number of keystrokes (varint),
+        for each keystroke the milliseconds since the previous one (varint), the symbols (UTF-8)
+    Most keystrokes take two bytes of time and one byte of symbol
+    Recording a keystroke only writes two preallocated array cells, the arrays double when they are full,
+    the varints are encoded once by encode
+
+    Parameters:
+        content_hash (bytes): the hash of the text, see get_content_hash
+        size (int): the number of keystrokes the buffers have room for at first
+
+    Attributes:
+        content_hash (bytes)
+        times (array[int]): the moment of each keystroke in milliseconds since the first one, never decreasing
+        codes (array[int]): the code point of the symbol of each keystroke
+        count (int): the number of keystrokes
+        start_time_stamp (int | None): the moment of the first keystroke in nanoseconds, None before it
+        last_time (int): the moment of the last keystroke in milliseconds since the first one
+    """
+    VERSION = 1
+    HASH_SIZE = 16
+
+    def __init__(self, content_hash: bytes, size: int = limits.RECORDING_BUFFER_SIZE):
+        self.content_hash = content_hash
+        self.times = array('q', bytes(8 * size))
+        self.codes = array('L', bytes(array('L').itemsize * size))
+        self.count = 0
+        self.start_time_stamp = None
+        self.last_time = 0
+
+    @classmethod
+    def get_content_hash(cls, text: str | StreamedText) -> bytes:
+        """
+        Returns the hash of the text, a long text is hashed by chunks
+        Parameters:
+            text (str | StreamedText): the text
+        Returns:
+            content_hash (bytes): HASH_SIZE bytes
+        """
+        digest = hashlib.blake2b(digest_size=cls.HASH_SIZE)
+        for start in range(0, len(text), limits.STREAMED_TEXT_CHUNK_SIZE):
+            digest.update(text[start:start + limits.STREAMED_TEXT_CHUNK_SIZE].encode('utf-8'))
+        return digest.digest()
+
+    def record(self, symbols: str, time_stamp: int) -> None:
+        """
+        Records the symbols typed by an input event
+        Parameters:
+            symbols (str): the symbols
+            time_stamp (int): the moment of the event in nanoseconds
+        """
+        if not symbols:
+            return
+        if self.start_time_stamp is None:
+            self.start_time_stamp = time_stamp
+        time = max(self.last_time, (time_stamp - self.start_time_stamp) // 1_000_000)
+        self.last_time = time
+        count = self.count
+        if count + len(symbols) > len(self.times):
+            self.grow(count + len(symbols))
+        times, codes = self.times, self.codes
+        for symbol in symbols:
+            times[count] = time
+            codes[count] = ord(symbol)
+            count += 1
+        self.count = count
+
+    def grow(self, size: int) -> None:
+        """
+        Doubles the buffers until they have room for size keystrokes
+        Parameters:
+            size (int): the number of keystrokes
+        """
+        capacity = max(1, len(self.times))
+        while capacity < size:
+            capacity *= 2
+        added = capacity - len(self.times)
+        self.times.frombytes(bytes(self.times.itemsize * added))
+        self.codes.frombytes(bytes(self.codes.itemsize * added))
+
+    def encode(self) -> bytes:
+        """
+        Encodes the recording, the times are encoded as the differences between the consecutive keystrokes
+        Returns:
+            data (bytes)
+        """
+        data = bytearray((self.VERSION,))
+        data += self.content_hash
+        encode_varint(self.count, data)
+        previous = 0
+        for time in self.times[:self.count]:
+            encode_varint(time - previous, data)
+            previous = time
+        data += ''.join(map(chr, self.codes[:self.count])).encode('utf-8')
+        return bytes(data)
+
+    @classmethod
+    def read_content_hash(cls, data: bytes | memoryview) -> bytes:
+        """
+        Returns the hash of the text of the encoded recording without decoding the keystrokes
+        Parameters:
+            data (bytes | memoryview): the encoded recording
+        Raises:
+            ValueError: unknown recording version
+        Returns:
+            content_hash (bytes)
+        """
+        if not data or data[0] != cls.VERSION:
+            raise ValueError('Unknown keystroke recording version')
+        return bytes(data[1:1 + cls.HASH_SIZE])
+
+    @classmethod
+    def decode(cls, data: bytes | memoryview) -> tuple[bytes, str, array]:
+        """
+        Decodes the recording
+        Parameters:
+            data (bytes | memoryview): the encoded recording
+        Raises:
+            ValueError: unknown recording version or broken data
+        Returns:
+            content_hash (bytes)
+            symbols (str): the symbols typed
+            times (array[int]): the moment of each symbol in milliseconds since the first one
+        """
+        content_hash = cls.read_content_hash(data)
+        try:
+            (count,), offset = decode_varints(data, 1 + cls.HASH_SIZE, 1)
+            deltas, offset = decode_varints(data, offset, count)
+            symbols = bytes(data[offset:]).decode('utf-8')
+        except (IndexError, UnicodeDecodeError) as error:
+            raise ValueError('Broken keystroke recording') from error
+        if len(symbols) != count:
+            raise ValueError('Broken keystroke recording')
+        time = 0
+        for i, delta in enumerate(deltas):
+            time += delta
+            deltas[i] = time
+        return content_hash, symbols, deltas
+
+    @classmethod
+    def iterate_keystrokes(cls, data: bytes | memoryview) -> Iterator[tuple[str, int]]:
+        """
+        Returns the keystrokes of the encoded recording, they can be passed to TypingSession.replay
+        Parameters:
+            data (bytes | memoryview): the encoded recording
+        Returns:
+            keystrokes (Iterator[tuple[str, int]]): pairs of a symbol and its moment in nanoseconds
+        """
+        _, symbols, times = cls.decode(data)
+        return zip(symbols, (time * 1_000_000 for time in times))
+
+
+class GhostTimeline:
+    """
+    GhostTimeline is the progress of a recorded attempt in time. The recording is replayed against the text once
+    when the timeline is made, only the moments the progress changed are kept, so the progress at a moment
+    is found by moving a pointer forward from the previous one: O(1) amortized per frame of the replay
+
+    Parameters:
+        data (bytes | memoryview): the encoded recording
+        text (str | StreamedText): the text the recording was typed on
+
+    Attributes:
+        times (array[int]): the moments the progress changed in milliseconds since the first keystroke
+        progress (array[int]): the progress from each of the moments
+        position (int): the index of the last moment passed
+    """
+    def __init__(self, data: bytes | memoryview, text: str | StreamedText):
+        _, symbols, times = KeystrokeRecording.decode(data)
+        self.times = array('q', [0])
+        self.progress = array('q', [0])
+        self.position = 0
+        progress, length = 0, len(text)
+        for symbol, time in zip(symbols, times):
+            if progress == length:
+                break
+            if text[progress] != symbol:
+                continue
+            progress += 1
+            if time == self.times[-1]:  # the symbols of one event
+                self.progress[-1] = progress
+            else:
+                self.times.append(time)
+                self.progress.append(progress)
+
+    def seek(self, time: int) -> int:
+        """
+        Returns the progress at the moment, the moments should not decrease from call to call
+        Parameters:
+            time (int): milliseconds since the first keystroke
+        Returns:
+            progress (int)
+        """
+        times, position = self.times, self.position
+        while position + 1 < len(times) and times[position + 1] <= time:
+            position += 1
+        self.position = position
+        return self.progress[position]
+
+    def is_finished(self) -> bool:
+        """
+        Returns whether the last moment was passed
+        Returns:
+            finished (bool)
+        """
+        return self.position == len(self.times) - 1
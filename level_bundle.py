@@ -0,0 +1,227 @@
+import argparse
+import mmap
+import os
+import struct
+from collections.abc import Iterator
+from types import MappingProxyType
+
+from level_validator import LevelError
+from constraints import texts
+
+
+class BundleText:
+    """
+    BundleText is a read-only ASCII text stored in the memory-mapped bundle, it is not copied to memory
+    It supports len, indexing, slicing, iteration and search of a symbol like str, only the requested symbols
+    are decoded
+
+    Parameters:
+        buffer (mmap.mmap): the mapped bundle
+        start (int): the offset of the text in the bundle
+        length (int): number of symbols, equal to number of bytes
+
+    Attributes:
+        buffer (mmap.mmap)
+        start (int)
+        length (int)
+    """
+    def __init__(self, buffer: mmap.mmap, start: int, length: int):
+        self.buffer = buffer
+        self.start = start
+        self.length = length
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, key: int | slice) -> str:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.length)
+            if step != 1:
+                raise ValueError('BundleText supports only continuous slices')
+            return self.buffer[self.start + start:self.start + max(start, stop)].decode('ascii')
+        if key < 0:
+            key += self.length
+        if not 0 <= key < self.length:
+            raise IndexError('BundleText index out of range')
+        return chr(self.buffer[self.start + key])
+
+    def find(self, symbol: str, start: int = 0, end: int | None = None) -> int:
+        """
+        Returns the lowest index of the symbol in text[start:end] like str.find, searches the bundle without decoding
+        Parameters:
+            symbol (str): a single symbol
+            start (int): the beginning of the searched part
+            end (int | None): the end of the searched part, the end of the text by default
+        Returns:
+            index (int): -1 in case the symbol is not found
+        """
+        start, end, _ = slice(start, end).indices(self.length)
+        if start >= end or not symbol.isascii():
+            return -1
+        index = self.buffer.find(symbol.encode('ascii'), self.start + start, self.start + end)
+        return index - self.start if index != -1 else -1
+
+    def __iter__(self) -> Iterator[str]:
+        for start in range(0, self.length, 1 << 14):
+            yield from self[start:start + (1 << 14)]
+
+
+class BundleEntry:
+    """
+    BundleEntry is a level as it is stored in the bundle, with the state of its source file when it was bundled
+
+    Attributes:
+        path (str): path to the source file of the level
+        modification_time (int): st_mtime_ns of the source file
+        size (int): size of the source file
+        title (str), goal_speed (float), goal_accuracy (float): the header of the level
+        text (str | BundleText): the text, ASCII texts are not copied from the bundle
+        histogram (MappingProxyType[str, int]): number of occurrences of each symbol in the text
+    """
+    __slots__ = ('path', 'modification_time', 'size', 'title', 'goal_speed', 'goal_accuracy', 'text', 'histogram')
+
+    def __init__(self, path: str, modification_time: int, size: int, title: str, goal_speed: float,
+                 goal_accuracy: float, text, histogram: MappingProxyType):
+        self.path = path
+        self.modification_time = modification_time
+        self.size = size
+        self.title = title
+        self.goal_speed = goal_speed
+        self.goal_accuracy = goal_accuracy
+        self.text = text
+        self.histogram = histogram
+
+
+class LevelBundle:
+    """
+    LevelBundle is a single file with all the levels of the levels directory, it is memory-mapped on open
+    and every level is read without opening its own file
+    Layout, little-endian:
+        magic (4 bytes), version (uint16), number of levels (uint32),
+        for each level an entry: source modification time (int64), source size (int64),
+            goal speed, goal accuracy (float64), offsets (uint64) and lengths in bytes (uint32) of the path,
+            the title and the text, number of symbols of the text (uint32),
+            offset (uint64) and number (uint32) of the histogram pairs
+        then the UTF-8 strings and the histogram pairs: code point (uint32), count (uint32)
+    The bundle is built by running this module
+
+    Parameters:
+        file_path (str): path to the bundle
+
+    Attributes:
+        file_path (str)
+        buffer (mmap.mmap): the mapped bundle
+        entries (dict[str, tuple]): the unpacked entry of each level by the path of its source file
+    """
+    MAGIC = b'TTLB'
+    VERSION = 1
+    HEADER = struct.Struct('<4sHI')
+    ENTRY = struct.Struct('<qqddQIQIQIIQI')
+    PAIR = struct.Struct('<II')
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        with open(file_path, 'rb') as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = self.HEADER.unpack_from(self.buffer)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError(f'{file_path} is not a level bundle of version {self.VERSION}')
+        self.entries = {}
+        for entry in self.ENTRY.iter_unpack(self.buffer[self.HEADER.size:self.HEADER.size + count * self.ENTRY.size]):
+            path_offset, path_length = entry[4:6]
+            self.entries[self.buffer[path_offset:path_offset + path_length].decode('utf-8')] = entry
+
+    @classmethod
+    def open(cls, file_path: str) -> 'LevelBundle | None':
+        """
+        Opens the bundle
+        Parameters:
+            file_path (str): path to the bundle
+        Returns:
+            bundle (LevelBundle | None): None in case there is no bundle or it is broken
+        """
+        try:
+            return cls(file_path)
+        except (OSError, ValueError, struct.error, UnicodeDecodeError):
+            return None
+
+    def get_entry(self, path: str) -> BundleEntry | None:
+        """
+        Returns the level of the source file
+        Parameters:
+            path (str): path to the source file of the level
+        Returns:
+            entry (BundleEntry | None): None in case the level is not in the bundle
+        """
+        entry = self.entries.get(path)
+        if entry is None:
+            return None
+        (modification_time, size, goal_speed, goal_accuracy, _, _, title_offset, title_length,
+         text_offset, text_length, symbols_count, histogram_offset, histogram_count) = entry
+        buffer = self.buffer
+        title = buffer[title_offset:title_offset + title_length].decode('utf-8')
+        if symbols_count == text_length:
+            text = BundleText(buffer, text_offset, text_length)
+        else:
+            text = buffer[text_offset:text_offset + text_length].decode('utf-8')
+        pairs = self.PAIR.iter_unpack(buffer[histogram_offset:histogram_offset + histogram_count * self.PAIR.size])
+        histogram = MappingProxyType({chr(code): count for code, count in pairs})
+        return BundleEntry(path, modification_time, size, title, goal_speed, goal_accuracy, text, histogram)
+
+    @classmethod
+    def build(cls, levels: list, file_path: str) -> None:
+        """
+        Writes the bundle of the levels, the old bundle is replaced only when the new one is written
+        Parameters:
+            levels (list[Level]): the levels, their paths should be the paths of existing files
+            file_path (str): path to the bundle
+        """
+        entries = []
+        data = []
+        offset = cls.HEADER.size + len(levels) * cls.ENTRY.size
+
+        def add(chunk: bytes) -> tuple[int, int]:
+            nonlocal offset
+            data.append(chunk)
+            offset += len(chunk)
+            return offset - len(chunk), len(chunk)
+
+        for level in levels:
+            stat = os.stat(level.path)
+            text = level.text if isinstance(level.text, str) else level.text[:]
+            path_location = add(level.path.encode('utf-8'))
+            title_location = add(level.title.encode('utf-8'))
+            text_location = add(text.encode('utf-8'))
+            histogram_location = add(b''.join(cls.PAIR.pack(ord(symbol), count)
+                                              for symbol, count in sorted(level.histogram.items())))
+            entries.append(cls.ENTRY.pack(stat.st_mtime_ns, stat.st_size, level.goal_speed, level.goal_accuracy,
+                                          *path_location, *title_location, *text_location, len(text),
+                                          histogram_location[0], len(level.histogram)))
+        temporary_path = file_path + '.tmp'
+        with open(temporary_path, 'wb') as file:
+            file.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(levels)))
+            file.write(b''.join(entries))
+            file.write(b''.join(data))
+        os.replace(temporary_path, file_path)
+
+
+def main() -> None:
+    from level_catalog import LevelCatalog
+    parser = argparse.ArgumentParser(description='Builds the bundle of the levels of the levels directory')
+    parser.add_argument('--output', default=texts.LEVEL_BUNDLE_PATH, help='path to the bundle')
+    args = parser.parse_args()
+    catalog = LevelCatalog()
+    catalog.bundle = None  # the levels are read from their files
+    levels = []
+    for path in catalog.get_paths():
+        level = catalog.load_level(path)
+        if isinstance(level, LevelError):
+            print(f'{path}: {level}')
+        else:
+            levels.append(level)
+    LevelBundle.build(levels, args.output)
+    print(f'{len(levels)} levels written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+import os
+from collections import Counter
+from types import MappingProxyType
+from typing import NamedTuple
+
+from singleton import Singleton
+from level_validator import LevelValidator, LevelError
+from streamed_text import StreamedText
+from level_bundle import BundleText, LevelBundle
+from constraints import texts, limits
+
+
+class Level(NamedTuple):
+    """
+    Level is a parsed and validated level
+
+    Attributes:
+        path (str): path to the file of the level
+        title (str): the title shown over the text
+        goal_speed (float): speed user should have to get maximal score
+        goal_accuracy (float): accuracy user should have to get maximal score
+        text (str | StreamedText | BundleText): text to type, big texts are read from the file only when needed,
+                                               bundled ASCII texts are read from the mapped bundle
+        histogram (MappingProxyType[str, int]): number of occurrences of each symbol in the text
+    """
+    path: str
+    title: str
+    goal_speed: float
+    goal_accuracy: float
+    text: str | StreamedText | BundleText
+    histogram: MappingProxyType
+
+
+class LevelCatalog(metaclass=Singleton):
+    """
+    LevelCatalog is a singleton keeping parsed levels, every level file is read once until it is modified
+    Levels from texts.LEVELS_DIRECTORY are listed on first use, they are parsed only when needed.
+    Levels are taken from the bundle at texts.LEVEL_BUNDLE_PATH when their files did not change since it was built,
+    the other files, like uploaded levels, are parsed
+    Does not take any parameters
+
+    Attributes:
+        bundle (LevelBundle | None): the mapped bundle, None in case it is not built
+        cache (dict[str, tuple[int, Level | LevelError]]): modification time and parsed level for each read file,
+                                                           the first error for invalid files
+        next_paths (dict[str, str] | None): the path of the next level in the levels directory for each level
+    """
+    def __init__(self):
+        self.bundle = LevelBundle.open(texts.LEVEL_BUNDLE_PATH)
+        self.cache = {}
+        self.next_paths = None
+
+    @staticmethod
+    def parse_level(file_path: str) -> Level | LevelError:
+        """
+        Reads and validates the level, the files bigger than limits.STREAMED_LEVEL_SIZE are not loaded in memory
+        Parameters:
+            file_path (str): path to the file of the level
+        Returns:
+            level (Level | LevelError): the level or the first error in case the file is not a valid level
+        """
+        try:
+            if os.path.getsize(file_path) > limits.STREAMED_LEVEL_SIZE:
+                return LevelCatalog.parse_streamed_level(file_path)
+            with open(file_path, 'r') as file:
+                content = file.read()
+        except (OSError, UnicodeDecodeError):
+            return LevelError(0, 0, texts.ERROR_UNREADABLE_FILE)
+        error = LevelValidator.validate_content(content)
+        if error is not None:
+            return error
+        title, goals_line, text = content.split('\n', 2)
+        goal_speed, goal_accuracy = map(float, goals_line.split())
+        return Level(file_path, title, goal_speed, goal_accuracy, text, MappingProxyType(Counter(text)))
+
+    @staticmethod
+    def parse_streamed_level(file_path: str) -> Level | LevelError:
+        """
+        Validates the level by chunks, then the text is scanned once and streamed from the file when needed
+        Parameters:
+            file_path (str): path to the file of the level
+        Raises:
+            OSError, UnicodeDecodeError: the file can not be read
+        Returns:
+            level (Level | LevelError): the level or the first error in case the file is not a valid level
+        """
+        error = LevelValidator.validate(file_path)
+        if error is not None:
+            return error
+        with open(file_path, 'r') as file:
+            title = file.readline().rstrip('\n')
+            goal_speed, goal_accuracy = map(float, file.readline().split())
+        text = StreamedText(file_path, skip_lines=2)
+        return Level(file_path, title, goal_speed, goal_accuracy, text, MappingProxyType(text.histogram))
+
+    def load_level(self, file_path: str) -> Level | LevelError:
+        """
+        Returns the level, reads it only if the file was changed since the last call.
+        The level is taken from the bundle if the file is the same as when the bundle was built
+        Parameters:
+            file_path (str): path to the file of the level
+        Returns:
+            level (Level | LevelError): the level or the first error in case the file is not a valid level
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return LevelError(0, 0, texts.ERROR_UNREADABLE_FILE)
+        modification_time = stat.st_mtime_ns
+        cached = self.cache.get(file_path)
+        if cached is not None and cached[0] == modification_time:
+            return cached[1]
+        entry = self.bundle.get_entry(file_path) if self.bundle is not None else None
+        if entry is not None and entry.modification_time == modification_time and entry.size == stat.st_size:
+            level = Level(file_path, entry.title, entry.goal_speed, entry.goal_accuracy, entry.text, entry.histogram)
+        else:
+            level = self.parse_level(file_path)
+        self.cache[file_path] = (modification_time, level)
+        return level
+
+    def get_level(self, file_path: str) -> Level | None:
+        """
+        Returns the level, parses it only if the file was changed since the last call
+        Parameters:
+            file_path (str): path to the file of the level
+        Returns:
+            level (Level | None): the level or None in case the file is not a valid level
+        """
+        level = self.load_level(file_path)
+        return level if isinstance(level, Level) else None
+
+    def get_paths(self) -> list[str]:
+        """
+        Returns the paths of the levels in the levels directory in order, lists the directory on first call
+        Returns:
+            paths (list[str])
+        """
+        if self.next_paths is None:
+            with os.scandir(texts.LEVELS_DIRECTORY) as entries:
+                paths = sorted(os.path.join(texts.LEVELS_DIRECTORY, entry.name) for entry in entries
+                               if entry.is_file() and entry.name.endswith(texts.LEVEL_PATH_LAST))
+            self.next_paths = dict(zip(paths, paths[1:]))
+            if paths:
+                self.next_paths[paths[-1]] = None
+        return list(self.next_paths)
+
+    def get_next_path(self, file_path: str) -> str | None:
+        """
+        Returns the path of the level following the given one in the levels directory
+        Parameters:
+            file_path (str): path to the file of the current level
+        Returns:
+            next_path (str | None): None in case the level is the last one or is not in the levels directory
+        """
+        self.get_paths()
+        return self.next_paths.get(file_path)
@@ -0,0 +1,338 @@
+import os
+import pickle
+import re
+import threading
+from array import array
+from typing import NamedTuple
+
+from singleton import Singleton
+from level_catalog import Level, LevelCatalog
+from constraints import limits, texts
+
+
+class LevelQuery(NamedTuple):
+    """
+    LevelQuery is a parsed search query, see LevelIndex.parse_query
+
+    Attributes:
+        terms (list[str]): lowercase words or parts of words every level should contain in its title or text
+        required (str): symbols every level should contain
+        allowed (str | None): the only symbols levels may contain besides whitespace, None if any are allowed
+        min_length (int), max_length (int | None): the range of the text length, includes both ends
+    """
+    terms: list[str]
+    required: str
+    allowed: str | None
+    min_length: int
+    max_length: int | None
+
+
+class LevelIndex(metaclass=Singleton):
+    """
+    LevelIndex is a singleton searching the levels by the words of their titles and texts, by the symbols
+    they contain and by their length. It indexes the levels of the levels directory and the uploaded levels
+    and keeps the index in texts.LEVEL_INDEX_PATH, so on start only the new and changed files are read.
+    Every level gets a document number. A word has the postings of the documents containing it, the trigrams
+    of the words point to the words, so a part of a word is found without reading the texts.
+    Every symbol has the bitset of the documents containing it, built from the symbol bitmask of each document.
+    A changed level gets a new number and its old document is only marked removed,
+    the index is rebuilt when the removed documents outnumber the others.
+    The index is updated on a background thread, so updates and searches hold its lock
+    Does not take any parameters
+
+    Attributes:
+        paths (list[str]): the path of each document
+        stamps (list[tuple[int, int]]): modification time and size of the file of each document
+        lengths (array[int]): the text length of each document
+        masks (list[int]): the symbols of each document, the bit ord(symbol) is set for each symbol
+        ids (dict[str, int]): the document of each indexed path
+        alive (int): bitset of the documents not removed
+        vocabulary (list[str]): the words in order of appearance
+        word_ids (dict[str, int]): the number of each word in vocabulary
+        postings (list[array[int]]): the increasing documents containing each word
+        trigrams (dict[str, array[int]]): the increasing words containing each trigram
+        symbols (dict[str, int]): bitset of the documents not removed containing each symbol
+        lock (RLock): guards the index
+    """
+    VERSION = 1
+    WORD = re.compile(r'\w+')
+    LENGTH = re.compile(r'len(<=|>=|<|>|=)(\d+)')
+    WHITESPACE = ' \t\n'
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.clear()
+        self.load()
+
+    def clear(self) -> None:
+        """
+        Makes the index empty
+        """
+        self.paths = []
+        self.stamps = []
+        self.lengths = array('l')
+        self.masks = []
+        self.ids = {}
+        self.alive = 0
+        self.vocabulary = []
+        self.word_ids = {}
+        self.postings = []
+        self.trigrams = {}
+        self.symbols = {}
+
+    def load(self) -> None:
+        """
+        Reads the index saved by the previous runs, keeps the index empty in case there is none, it is broken
+        or it was saved in another format
+        """
+        try:
+            with open(texts.LEVEL_INDEX_PATH, 'rb') as file:
+                state = pickle.load(file)
+            if not isinstance(state, dict) or state.get('version') != self.VERSION:
+                return
+            for name in ('paths', 'stamps', 'lengths', 'masks', 'ids', 'alive', 'vocabulary', 'word_ids',
+                         'postings', 'trigrams', 'symbols'):
+                setattr(self, name, state[name])
+            if not len(self.paths) == len(self.stamps) == len(self.lengths) == len(self.masks) or \
+                    len(self.vocabulary) != len(self.postings):
+                raise ValueError('The parts of the level index do not match')
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError, KeyError,
+                TypeError, ValueError):
+            self.clear()
+
+    def save(self) -> None:
+        """
+        Writes the index to a temporary file which then replaces the old one
+        """
+        state = {name: getattr(self, name) for name in ('paths', 'stamps', 'lengths', 'masks', 'ids', 'alive',
+                                                        'vocabulary', 'word_ids', 'postings', 'trigrams', 'symbols')}
+        state['version'] = self.VERSION
+        temporary_path = texts.LEVEL_INDEX_PATH + '.tmp'
+        try:
+            with open(temporary_path, 'wb') as file:
+                pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, texts.LEVEL_INDEX_PATH)
+        except OSError:
+            pass
+
+    @staticmethod
+    def get_stamp(path: str) -> tuple[int, int] | None:
+        """
+        Returns the modification time and the size of the file
+        Parameters:
+            path (str): path to the file
+        Returns:
+            stamp (tuple[int, int] | None): None in case the file does not exist
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def add(self, path: str, stamp: tuple[int, int], level: Level) -> None:
+        """
+        Adds the level as a new document
+        Parameters:
+            path (str): path to the file of the level
+            stamp (tuple[int, int]): modification time and size of the file
+            level (Level): the level
+        """
+        document = len(self.paths)
+        bit = 1 << document
+        self.paths.append(path)
+        self.stamps.append(stamp)
+        self.lengths.append(len(level.text))
+        mask = 0
+        for symbol in level.histogram:
+            mask |= 1 << ord(symbol)
+            self.symbols[symbol] = self.symbols.get(symbol, 0) | bit
+        self.masks.append(mask)
+        content = level.title + '\n' + level.text[:limits.INDEX_TEXT_LENGTH]
+        for word in set(self.WORD.findall(content.lower())):
+            word_id = self.word_ids.get(word)
+            if word_id is None:
+                word_id = len(self.vocabulary)
+                self.vocabulary.append(word)
+                self.word_ids[word] = word_id
+                self.postings.append(array('l'))
+                for trigram in {word[i:i + 3] for i in range(len(word) - 2)}:
+                    self.trigrams.setdefault(trigram, array('l')).append(word_id)
+            self.postings[word_id].append(document)
+        self.ids[path] = document
+        self.alive |= bit
+
+    def remove(self, path: str) -> None:
+        """
+        Marks the document of the path removed
+        Parameters:
+            path (str): the indexed path
+        """
+        document = self.ids.pop(path)
+        bit = 1 << document
+        self.alive &= ~bit
+        mask = self.masks[document]
+        for symbol, documents in self.symbols.items():
+            if mask >> ord(symbol) & 1:
+                self.symbols[symbol] = documents & ~bit
+
+    def index_path(self, path: str) -> bool:
+        """
+        Indexes the level unless it is indexed and its file was not changed since, removes the levels which are
+        not valid anymore
+        Parameters:
+            path (str): path to the file of the level
+        Returns:
+            changed (bool): whether the index was changed
+        """
+        stamp = self.get_stamp(path)
+        document = self.ids.get(path)
+        if document is not None and stamp == self.stamps[document]:
+            return False
+        if document is not None:
+            self.remove(path)
+        level = LevelCatalog().get_level(path) if stamp is not None else None
+        if level is not None:
+            self.add(path, stamp, level)
+        return document is not None or level is not None
+
+    def add_path(self, path: str) -> bool:
+        """
+        Indexes an uploaded level, it is kept in the index while its file exists
+        Parameters:
+            path (str): path to the file of the level
+        Returns:
+            changed (bool): whether the index was changed
+        """
+        with self.lock:
+            changed = self.index_path(path)
+            if changed:
+                self.save()
+        return changed
+
+    def update(self) -> list[str]:
+        """
+        Indexes the new and the changed levels of the levels directory and the uploaded levels,
+        removes the levels which are deleted or not valid anymore, saves the index if it was changed
+        Returns:
+            paths (list[str]): the indexed paths, the levels directory in order, then the uploaded levels
+        """
+        directory = LevelCatalog().get_paths()
+        known = set(directory)
+        with self.lock:
+            uploaded = sorted(path for path in self.ids if path not in known)
+            changed = False
+            for path in directory + uploaded:
+                changed |= self.index_path(path)
+            if len(self.paths) > 2 * max(len(self.ids), limits.INDEX_MIN_DOCUMENTS):  # mostly removed documents
+                paths = list(self.ids)
+                self.clear()
+                for path in paths:
+                    self.index_path(path)
+                changed = True
+            if changed:
+                self.save()
+            return [path for path in directory + uploaded if path in self.ids]
+
+    @classmethod
+    def parse_query(cls, query: str) -> LevelQuery:
+        """
+        Parses the search query: has:SYMBOLS keeps the levels containing all the symbols, only:SYMBOLS keeps
+        the levels containing no other symbols besides whitespace, len<N, len<=N, len>N, len>=N and len=N
+        bound the text length, the words of the rest should be in the title or the text of the level,
+        a word of three and more symbols may be a part of a word
+        Parameters:
+            query (str): the query
+        Returns:
+            query (LevelQuery)
+        """
+        terms = []
+        required = ''
+        allowed = None
+        min_length, max_length = 0, None
+        for token in query.split():
+            length = cls.LENGTH.fullmatch(token)
+            if token.startswith('has:'):
+                required += token[4:]
+            elif token.startswith('only:'):
+                allowed = (allowed or '') + token[5:]
+            elif length is not None:
+                operator, value = length.group(1), int(length.group(2))
+                if operator in ('<', '<=', '='):
+                    bound = value - 1 if operator == '<' else value
+                    max_length = bound if max_length is None else min(max_length, bound)
+                if operator in ('>', '>=', '='):
+                    min_length = max(min_length, value + 1 if operator == '>' else value)
+            else:
+                terms.extend(cls.WORD.findall(token.lower()))
+        return LevelQuery(terms, required, allowed, min_length, max_length)
+
+    def find_term(self, term: str) -> set[int]:
+        """
+        Returns the documents containing the word, for words of three and more symbols also the documents
+        containing it as a part of a word
+        Parameters:
+            term (str): lowercase word
+        Returns:
+            documents (set[int]): including the removed ones
+        """
+        if len(term) < 3:
+            word_id = self.word_ids.get(term)
+            return set(self.postings[word_id]) if word_id is not None else set()
+        lists = sorted((self.trigrams.get(term[i:i + 3], ()) for i in range(len(term) - 2)), key=len)
+        words = set(lists[0])
+        for word_ids in lists[1:]:
+            words.intersection_update(word_ids)
+        documents = set()
+        for word_id in words:
+            if term in self.vocabulary[word_id]:
+                documents.update(self.postings[word_id])
+        return documents
+
+    def search(self, query: str) -> set[str]:
+        """
+        Finds the levels matching the query, see parse_query
+        Parameters:
+            query (str): the query
+        Returns:
+            paths (set[str]): the paths of the levels found
+        """
+        query = self.parse_query(query)
+        with self.lock:
+            return self.find(query)
+
+    def find(self, query: LevelQuery) -> set[str]:
+        """
+        Finds the levels matching the parsed query, should be called with the lock held
+        Parameters:
+            query (LevelQuery): the query
+        Returns:
+            paths (set[str]): the paths of the levels found
+        """
+        documents = self.alive
+        for symbol in set(query.required):
+            documents &= self.symbols.get(symbol, 0)
+        if query.allowed is not None:
+            allowed = set(query.allowed + self.WHITESPACE)
+            for symbol, symbol_documents in self.symbols.items():
+                if symbol not in allowed:
+                    documents &= ~symbol_documents
+        if query.terms:
+            candidates = None
+            for term in sorted(set(query.terms), key=len, reverse=True):  # longer terms are usually rarer
+                found = self.find_term(term)
+                candidates = found if candidates is None else candidates & found
+                if not candidates:
+                    break
+            candidates = [document for document in candidates if documents >> document & 1]
+        else:
+            bits = bin(documents)[:1:-1]  # the bit of document i is at position i
+            candidates = []
+            position = bits.find('1')
+            while position != -1:
+                candidates.append(position)
+                position = bits.find('1', position + 1)
+        max_length = query.max_length
+        return {self.paths[document] for document in candidates
+                if query.min_length <= self.lengths[document] and (max_length is None or
+                                                                    self.lengths[document] <= max_length)}
@@ -0,0 +1,69 @@
+from PySide6 import QtCore as qtc
+from __feature__ import snake_case, true_property
+
+import queue
+import threading
+
+from singleton import Singleton
+from level_index import LevelIndex
+from level_recommender import LevelRecommender
+
+
+class QObjectSingleton(type(qtc.QObject), Singleton):
+    """
+    QObjectSingleton is a metaclass for singleton classes inheriting QObject
+    """
+
+
+class LevelIndexer(qtc.QObject, metaclass=QObjectSingleton):
+    """
+    LevelIndexer is a singleton updating LevelIndex on one background thread, inherits QObject
+    The updates and the uploaded levels are queued, the requests made while an update is running are done together
+    by the next one. After every update the indexed paths are sent by the signal levels_indexed, the signal is
+    delivered on the threads of the receivers, so the models deleted meanwhile are disconnected by Qt.
+    Then the levels are ranked again by LevelRecommender, so the recommendations do not wait for the index
+    Does not take any parameters
+
+    Attributes:
+        paths (list[str] | None): the paths of the last update, see LevelIndex.update, None until it is finished
+        requests (SimpleQueue): the uploaded levels to index, None to update the index only
+        thread (Thread): the thread doing the updates
+    """
+    levels_indexed = qtc.Signal(list)
+
+    def __init__(self):
+        super().__init__()
+        self.paths = None
+        self.requests = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.run, name='level-indexer', daemon=True)
+        self.thread.start()
+
+    def update(self) -> None:
+        """
+        Requests an update of the index, levels_indexed is emitted when it is done
+        """
+        self.requests.put(None)
+
+    def add_path(self, path: str) -> None:
+        """
+        Requests indexing an uploaded level and an update of the index, levels_indexed is emitted when it is done
+        Parameters:
+            path (str): path to the file of the level
+        """
+        self.requests.put(path)
+
+    def run(self) -> None:
+        """
+        Does the requests on the background thread until the application exits
+        """
+        index = LevelIndex()
+        while True:
+            requests = [self.requests.get()]
+            while not self.requests.empty():
+                requests.append(self.requests.get())
+            for path in requests:
+                if path is not None:
+                    index.add_path(path)
+            self.paths = index.update()
+            self.levels_indexed.emit(self.paths)
+            LevelRecommender().update()
@@ -0,0 +1,187 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from level_validator import LevelValidator, LevelError
+from constraints import limits, texts
+
+TYPEABLE_SYMBOLS = frozenset(map(chr, range(ord(' '), ord('~') + 1)))
+SHIFT_SYMBOLS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZ~!@#$%^&*()_+{}|:"<>?')
+NUMBER_ROW_SYMBOLS = frozenset('`1234567890-=~!@#$%^&*()_+')
+REPLACEMENTS = str.maketrans({
+    '\xa0': ' ', '\u2002': ' ', '\u2003': ' ', '\u2009': ' ',  # no-break and typographic spaces
+    '\u2018': "'", '\u2019': "'", '\u201a': "'", '\u201c': '"', '\u201d': '"', '\u201e': '"', '\xab': '"', '\xbb': '"',
+    '\u2010': '-', '\u2011': '-', '\u2012': '-', '\u2013': '-', '\u2014': '-', '\u2212': '-',  # hyphens and dashes
+    '\u2026': '...', '\u200b': '', '\ufeff': '',  # ellipsis, zero width space and byte order mark
+})
+TRAILING_SPACES = re.compile(r'[ \t]+$', re.MULTILINE)
+
+
+def normalize_content(content: str) -> str:
+    """
+    Fixes the usual differences of the texts from the levels format: line breaks of other systems,
+    typographic quotes, dashes and spaces, spaces at the ends of lines and empty lines at the end of the text
+    Parameters:
+        content (str): the whole level
+    Returns:
+        content (str): the normalized level
+    """
+    content = content.replace('\r\n', '\n').replace('\r', '\n').translate(REPLACEMENTS)
+    return TRAILING_SPACES.sub('', content).rstrip('\n')
+
+
+def estimate_difficulty(histogram: Counter, length: int, goal_speed: float) -> float:
+    """
+    Estimates the difficulty of a level as the goal speed weighted by the mean effort of a symbol:
+    a symbol costs one keystroke, limits.SHIFT_EFFORT more with shift and limits.NUMBER_ROW_EFFORT more
+    in the number row
+    Parameters:
+        histogram (Counter[str]): number of occurrences of each symbol in the text
+        length (int): the length of the text
+        goal_speed (float): goal speed of the level
+    Returns:
+        difficulty (float)
+    """
+    effort = length
+    for symbol, count in histogram.items():
+        if symbol in SHIFT_SYMBOLS:
+            effort += limits.SHIFT_EFFORT * count
+        if symbol in NUMBER_ROW_SYMBOLS:
+            effort += limits.NUMBER_ROW_EFFORT * count
+    return goal_speed * effort / length
+
+
+def check_level(file_path: str, normalize: bool = False, write: bool = False) -> dict:
+    """
+    Validates the level with the rules of LevelValidator and collects the statistics of its text
+    Parameters:
+        file_path (str): path to the file of the level
+        normalize (bool): whether the normalized level is checked instead of the file
+        write (bool): whether the file is replaced by the normalized level in case it is valid and was changed
+    Returns:
+        report (dict): the error or the statistics of the level
+    """
+    report = {'path': file_path}
+    try:
+        with open(file_path, 'r', encoding='utf-8-sig' if normalize else None) as file:
+            content = file.read()
+    except (OSError, UnicodeDecodeError):
+        content = None
+    error = LevelError(0, 0, texts.ERROR_UNREADABLE_FILE) if content is None else None
+    if content is not None and normalize:
+        normalized = normalize_content(content)
+        report['normalized'] = normalized != content
+        content = normalized
+    if error is None:
+        error = LevelValidator.validate_content(content)
+    if error is not None:
+        report['error'] = {'line': error.line, 'column': error.column, 'message': error.message}
+        return report
+    if write and report.get('normalized'):
+        temporary_path = file_path + '.tmp'
+        with open(temporary_path, 'w') as file:
+            file.write(content)
+        os.replace(temporary_path, file_path)
+    title, goals_line, text = content.split('\n', 2)
+    goal_speed, goal_accuracy = map(float, goals_line.split())
+    histogram = Counter(text)
+    report.update({
+        'title': title,
+        'goal_speed': goal_speed,
+        'goal_accuracy': goal_accuracy,
+        'length': len(text),
+        'lines': text.count('\n') + 1,
+        'words': len(text.split()),
+        'symbols': len(histogram),
+        'coverage': round(len(TYPEABLE_SYMBOLS.intersection(histogram)) / len(TYPEABLE_SYMBOLS), 4),
+        'difficulty': round(estimate_difficulty(histogram, len(text), goal_speed), 2),
+    })
+    return report
+
+
+def check_levels(file_paths: list[str], normalize: bool, write: bool) -> list[dict]:
+    """
+    Checks a chunk of the levels, it is the task of a worker process
+    Parameters:
+        file_paths (list[str]): paths to the files of the levels
+        normalize (bool), write (bool): see check_level
+    Returns:
+        reports (list[dict])
+    """
+    return [check_level(file_path, normalize, write) for file_path in file_paths]
+
+
+def check_pack(directory: str, normalize: bool = False, write: bool = False, workers: int | None = None) -> dict:
+    """
+    Checks all the levels of the directory. The levels are split into chunks checked by a pool of processes,
+    small packs are checked in the current process
+    Parameters:
+        directory (str): the directory with the level files
+        normalize (bool), write (bool): see check_level
+        workers (int | None): number of processes, the number of processors by default
+    Returns:
+        report (dict): the summary of the pack and the reports of its levels
+    """
+    start = time.perf_counter()
+    with os.scandir(directory) as entries:
+        paths = sorted(entry.path for entry in entries
+                       if entry.is_file() and entry.name.endswith(texts.LEVEL_PATH_LAST))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) < limits.PACK_PARALLEL_MIN:
+        levels = check_levels(paths, normalize, write)
+    else:
+        chunk_size = -(-len(paths) // (workers * limits.PACK_TASKS_PER_WORKER))
+        chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+        with ProcessPoolExecutor(workers) as executor:
+            levels = [report for reports in executor.map(check_levels, chunks, [normalize] * len(chunks),
+                                                         [write] * len(chunks))
+                      for report in reports]
+    valid = [level for level in levels if 'error' not in level]
+    summary = {
+        'directory': directory,
+        'levels': len(levels),
+        'valid': len(valid),
+        'invalid': len(levels) - len(valid),
+        'errors': dict(Counter(level['error']['message'] for level in levels if 'error' in level).most_common()),
+        'length': sum(level['length'] for level in valid),
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+    if normalize:
+        summary['normalized'] = sum(level.get('normalized', False) for level in levels)
+    return {'summary': summary, 'levels': levels}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='main.py check',
+                                     description='Validates the levels of a directory and reports their statistics '
+                                                 'as JSON, without starting the interface')
+    parser.add_argument('directory', help='the directory with the level files')
+    parser.add_argument('--normalize', action='store_true',
+                        help='check the levels after fixing line breaks, typographic symbols and trailing spaces')
+    parser.add_argument('--write', action='store_true',
+                        help='with --normalize, replace the files changed by normalizing that became valid')
+    parser.add_argument('--workers', type=int, help='number of processes, the number of processors by default')
+    parser.add_argument('--output', help='file to write the JSON report to, standard output by default')
+    args = parser.parse_args(argv)
+    if args.write and not args.normalize:
+        parser.error('--write requires --normalize')
+    try:
+        report = check_pack(args.directory, args.normalize, args.write, args.workers)
+    except OSError as error:
+        parser.error(str(error))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 1 if report['summary']['invalid'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
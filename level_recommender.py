@@ -0,0 +1,180 @@
+import os
+import threading
+import zipfile
+import numpy as np
+from collections.abc import Iterable
+
+from singleton import Singleton
+from level_catalog import Level, LevelCatalog
+from level_index import LevelIndex
+from symbol_statistics import SymbolStatistics
+from constraints import texts
+
+
+class LevelRecommender(metaclass=Singleton):
+    """
+    LevelRecommender ranks the levels by how much they train the symbols the user mistypes the most
+    Every level is a row of the level x symbol matrix of the frequencies of its symbols, the columns are the indices
+    of SymbolStatistics. The score of a level is the expected miss rate of the user on its text, so all the levels
+    are scored at once by the product of the matrix and the vector of the miss rates of the symbols.
+    The matrix is kept in texts.LEVEL_MATRIX_PATH with the file stamps of LevelIndex, on start only the rows
+    of the new and changed levels are calculated. The updates read the levels, so they are done on background threads,
+    at startup and by LevelIndexer after the index is changed, the levels are not recommended until the first one
+    is finished. The recommendations are made of the last ranked rows without waiting for LevelIndex
+    Does not take any parameters
+
+    Attributes:
+        paths (list[str]): the level of each row
+        rows (dict[str, int]): the row of each level
+        stamps (np.ndarray): n x 2 matrix of the modification time and the size of the file of each level
+        matrix (np.ndarray): n x SymbolStatistics.SIZE matrix of the frequencies of the symbols of each level
+        synced (bool): whether LevelIndex was updated since the start
+        indexed (tuple[int, int] | None): the numbers of documents and levels of LevelIndex the rows were made of,
+                                          LevelIndex only adds documents, so the rows are up to date while they match
+        ready (Event): set when the first update is finished
+        updating (Lock): makes the updates one at a time
+        lock (Lock): guards replacing the rows, it is held only while they are replaced or read
+    """
+    VERSION = 1
+
+    def __init__(self):
+        self.paths = []
+        self.rows = {}
+        self.stamps = np.zeros((0, 2), np.int64)
+        self.matrix = np.zeros((0, SymbolStatistics.SIZE), np.float32)
+        self.synced = False
+        self.indexed = None
+        self.ready = threading.Event()
+        self.updating = threading.Lock()
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """
+        Reads the matrix saved by the previous runs, keeps the matrix empty in case there is none or it is broken
+        """
+        try:
+            with np.load(texts.LEVEL_MATRIX_PATH) as state:
+                version, paths, stamps, matrix = state['version'], state['paths'], state['stamps'], state['matrix']
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            return
+        if version != self.VERSION or matrix.shape != (len(paths), SymbolStatistics.SIZE) or \
+                stamps.shape != (len(paths), 2):
+            return
+        self.paths = paths.tolist()
+        self.rows = {path: row for row, path in enumerate(self.paths)}
+        self.stamps = stamps
+        self.matrix = matrix.astype(np.float32)
+
+    def save(self) -> None:
+        """
+        Writes the matrix to a temporary file which then replaces the old one
+        """
+        temporary_path = texts.LEVEL_MATRIX_PATH + '.tmp'
+        try:
+            with open(temporary_path, 'wb') as file:
+                np.savez(file, version=self.VERSION, paths=np.array(self.paths, dtype=str), stamps=self.stamps,
+                         matrix=self.matrix)
+            os.replace(temporary_path, texts.LEVEL_MATRIX_PATH)
+        except OSError:
+            pass
+
+    @staticmethod
+    def get_frequencies(level: Level) -> np.ndarray:
+        """
+        Returns the fraction of each symbol among the symbols of the level
+        Parameters:
+            level (Level): the level
+        Returns:
+            frequencies (np.ndarray): vector of SymbolStatistics.SIZE
+        """
+        counts = SymbolStatistics.to_vector(level.histogram)
+        total = counts.sum()
+        return counts / total if total else counts.astype(np.float64)
+
+    def update(self) -> None:
+        """
+        Makes the rows of the levels of LevelIndex, calculates the rows of the new and the changed levels only,
+        saves the matrix if it was changed. LevelIndex is updated on the first call, then ready is set.
+        It waits for LevelIndex, so it is called on background threads only
+        """
+        index = LevelIndex()
+        with self.updating:
+            if not self.synced:
+                index.update()
+                self.synced = True
+            with index.lock:
+                indexed = (len(index.paths), len(index.ids))
+                changed = indexed != self.indexed
+                if changed:
+                    paths = list(index.ids)
+                    stamps = np.array([index.stamps[document] for document in index.ids.values()],
+                                      np.int64).reshape(-1, 2)
+            if changed:
+                self.indexed = indexed
+                self.update_rows(paths, stamps)
+        self.ready.set()
+
+    def update_rows(self, paths: list[str], stamps: np.ndarray) -> None:
+        """
+        Makes the rows of the levels, calculates the rows of the new and the changed levels only,
+        saves the matrix if it was changed
+        Parameters:
+            paths (list[str]): the levels
+            stamps (np.ndarray): n x 2 matrix of the modification time and the size of the file of each level
+        """
+        if paths == self.paths and np.array_equal(stamps, self.stamps):
+            return
+        old_rows = np.fromiter((self.rows.get(path, -1) for path in paths), np.intp, len(paths))
+        kept = old_rows >= 0
+        kept[kept] = (self.stamps[old_rows[kept]] == stamps[kept]).all(axis=1)
+        matrix = np.zeros((len(paths), SymbolStatistics.SIZE), np.float32)
+        matrix[kept] = self.matrix[old_rows[kept]]
+        catalog = LevelCatalog()
+        for row in np.flatnonzero(~kept):
+            level = catalog.get_level(paths[row])
+            if level is not None:
+                matrix[row] = self.get_frequencies(level)
+        rows = {path: row for row, path in enumerate(paths)}
+        with self.lock:
+            self.paths, self.rows, self.stamps, self.matrix = paths, rows, stamps, matrix
+        self.save()
+
+    @staticmethod
+    def get_miss_rates(statistics: SymbolStatistics) -> np.ndarray:
+        """
+        Returns the fraction of mistakes among the types of each symbol, the symbols never typed get the mean miss rate
+        Parameters:
+            statistics (SymbolStatistics): the statistics of the user
+        Returns:
+            miss_rates (np.ndarray): vector of SymbolStatistics.SIZE
+        """
+        total = statistics.hits + statistics.misses
+        mean = statistics.misses.sum() / total.sum() if total.sum() else 0.0
+        return np.divide(statistics.misses, total, out=np.full(total.shape, mean), where=total > 0)
+
+    def recommend(self, statistics: SymbolStatistics, count: int, excluded: Iterable[str] = ()) -> list[str]:
+        """
+        Returns the levels with the highest expected miss rate of the user, ranks the rows of the last update
+        Parameters:
+            statistics (SymbolStatistics): the statistics of the user
+            count (int): the number of levels to return
+            excluded (Iterable[str]): the levels not to return
+        Returns:
+            paths (list[str]): at most count levels, the best one first, none in case the user has no statistics
+                               or the first update is not finished
+        """
+        if not self.ready.is_set() or not statistics.misses.any():
+            return []
+        with self.lock:
+            paths, rows, matrix = self.paths, self.rows, self.matrix
+        scores = matrix @ self.get_miss_rates(statistics).astype(np.float32)
+        for path in excluded:
+            if path in rows:
+                scores[rows[path]] = -np.inf
+        count = min(count, int(np.isfinite(scores).sum()))
+        if count <= 0:
+            return []
+        best = np.argpartition(-scores, count - 1)[:count]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [paths[row] for row in best]
@@ -1,29 +1,134 @@
+import io
+import re
+from typing import NamedTuple, TextIO
+
 from singleton import Singleton
+from constraints import limits, texts
+
+
+class LevelError(NamedTuple):
+    """
+    LevelError is the reason a file is not a valid level
+
+    Attributes:
+        line (int): the number of the line with the error, starting from 1, 0 if the error is not in a line
+        column (int): the number of the symbol in the line, starting from 1, 0 if the error is in the whole line
+        message (str): description of the error
+    """
+    line: int
+    column: int
+    message: str
+
+    def __str__(self) -> str:
+        if self.line == 0:
+            return self.message
+        if self.column == 0:
+            return f'{texts.LINE_TEXT} {self.line}: {self.message}'
+        return f'{texts.LINE_TEXT} {self.line}, {texts.COLUMN_TEXT} {self.column}: {self.message}'
 
 
 class LevelValidator(metaclass=Singleton):
     """
     LevelValidator checks that text file is a valid level
+    The file is read by chunks and the check stops at the first error, so any file is checked in constant memory
     """
+    INVALID_SYMBOL = re.compile(r'[^\t\n -~]')
+
     @staticmethod
-    def is_level_valid(file_path: str) -> bool:
+    def validate_header(title: str, goals_line: str) -> LevelError | None:
+        """
+        Checks the first two lines of the level
+        Parameters:
+            title (str): the first line, the title
+            goals_line (str): the second line with goal speed and goal accuracy
+        Returns:
+            error (LevelError | None): the first error, None in case the lines are valid
+        """
+        if not title.endswith('\n'):
+            if len(title) >= limits.MAX_HEADER_LINE_LENGTH:
+                return LevelError(1, 0, texts.ERROR_LONG_LINE)
+            return LevelError(2, 0, texts.ERROR_NO_GOALS)
+        if not goals_line.endswith('\n') and len(goals_line) >= limits.MAX_HEADER_LINE_LENGTH:
+            return LevelError(2, 0, texts.ERROR_LONG_LINE)
+        goals = goals_line.split()
+        if len(goals) != 2:
+            return LevelError(2, 0, texts.ERROR_NO_GOALS)
+        speed_column = goals_line.find(goals[0]) + 1
+        accuracy_column = goals_line.find(goals[1], speed_column + len(goals[0]) - 1) + 1
         try:
-            file = open(file_path, 'r')
-        except (FileNotFoundError, FileExistsError):
-            return False
-        lines = file.readlines()
-        if len(lines) <= 2:
-            return False
-        second_line = lines[1].split()
-        if len(second_line) != 2:
-            return False
+            goal_speed = float(goals[0])
+        except ValueError:
+            return LevelError(2, speed_column, texts.ERROR_GOAL_SPEED)
         try:
-            goal_speed = float(second_line[0])
-            goal_accuracy = float(second_line[1])
+            goal_accuracy = float(goals[1])
         except ValueError:
-            return False
-        if goal_speed < 0 or goal_speed > 500:
-            return False
-        if goal_accuracy < 0 or goal_accuracy > 1:
-            return False
-        return True
+            return LevelError(2, accuracy_column, texts.ERROR_GOAL_ACCURACY)
+        if not limits.MIN_GOAL_SPEED <= goal_speed <= limits.MAX_GOAL_SPEED:
+            return LevelError(2, speed_column, texts.ERROR_GOAL_SPEED)
+        if not 0 < goal_accuracy <= 1:
+            return LevelError(2, accuracy_column, texts.ERROR_GOAL_ACCURACY)
+        if not goals_line.endswith('\n'):
+            return LevelError(3, 0, texts.ERROR_EMPTY_TEXT)
+        return None
+
+    @staticmethod
+    def validate_stream(file: TextIO) -> LevelError | None:
+        """
+        Checks the level read from the stream: the header lines, then the text by chunks
+        Parameters:
+            file (TextIO): the stream positioned at the start of the level
+        Returns:
+            error (LevelError | None): the first error, None in case the level is valid
+        """
+        title = file.readline(limits.MAX_HEADER_LINE_LENGTH)
+        goals_line = file.readline(limits.MAX_HEADER_LINE_LENGTH) if title.endswith('\n') else ''
+        error = LevelValidator.validate_header(title, goals_line)
+        if error is not None:
+            return error
+        line = 3
+        line_start = 0  # the offset of the current line start relative to the current chunk
+        empty = True
+        while chunk := file.read(limits.VALIDATOR_CHUNK_SIZE):
+            empty = False
+            invalid = LevelValidator.INVALID_SYMBOL.search(chunk)
+            end = len(chunk) if invalid is None else invalid.start()
+            line += chunk.count('\n', 0, end)
+            last_newline = chunk.rfind('\n', 0, end)
+            if last_newline != -1:
+                line_start = last_newline + 1
+            if invalid is not None:
+                return LevelError(line, end - line_start + 1, texts.ERROR_INVALID_SYMBOL.format(repr(invalid.group())))
+            line_start -= len(chunk)
+        if empty:
+            return LevelError(3, 0, texts.ERROR_EMPTY_TEXT)
+        return None
+
+    @staticmethod
+    def validate(file_path: str) -> LevelError | None:
+        """
+        Checks the file is a valid level
+        Parameters:
+            file_path (str): path to the file
+        Returns:
+            error (LevelError | None): the first error, None in case the level is valid
+        """
+        try:
+            with open(file_path, 'r') as file:
+                return LevelValidator.validate_stream(file)
+        except (OSError, UnicodeDecodeError):
+            return LevelError(0, 0, texts.ERROR_UNREADABLE_FILE)
+
+    @staticmethod
+    def validate_content(content: str) -> LevelError | None:
+        """
+        Checks the level already read to memory
+        Parameters:
+            content (str): the whole level
+        Returns:
+            error (LevelError | None): the first error, None in case the level is valid
+        """
+        return LevelValidator.validate_stream(io.StringIO(content))
+
+    @staticmethod
+    def is_level_valid(file_path: str) -> bool:
+        return LevelValidator.validate(file_path) is None
@@ -1,67 +1,138 @@
-from PySide6 import QtWidgets as qtw, QtCore as qtc
+from PySide6 import QtWidgets as qtw, QtCore as qtc, QtGui as qtg
 from __feature__ import snake_case, true_property
-from functools import partial
 
-from constraints import colors, fonts, sizes, texts, level_list
+from constraints import colors, fonts, sizes, texts
 from main_window_actions import MainWindowActions
 from base_page import BasePage
 from base_header import BaseHeader
-from base_button import BaseButton
+from levels_model import LevelsModel
 
 
-class BlockOfLevels(qtw.QFrame):
+class LevelDelegate(qtw.QStyledItemDelegate):
     """
-    BlockOfLevels is a horizontal block of buttons to load levels, inherits QFrame
-
-    Parameters:
-        first (int), last(int): the range of the levels block contains, includes first, excludes last
+    LevelDelegate paints a level of the levels grid as a button with its number and best score, inherits
+    QStyledItemDelegate. The completed levels are green
+    Does not take any parameters
     """
-    def __init__(self, first: int, last: int):
-        super().__init__()
-        layout = qtw.QHBoxLayout()
-        layout.set_alignment(qtc.Qt.AlignmentFlag.AlignLeft)
-        for i in range(first, last):
-            number_text = f'{i:02d}'
-            button = BaseButton(number_text, partial(MainWindowActions().level_run_function,
-                                                     texts.LEVEL_PATH_FIRST + number_text + texts.LEVEL_PATH_LAST))
-            button.set_fixed_size(qtc.QSize(sizes.BUTTON_SIZE, sizes.BUTTON_SIZE))
-            layout.add_widget(button)
-        self.set_layout(layout)
+    def paint(self, painter: qtg.QPainter, option: qtw.QStyleOptionViewItem, index: qtc.QModelIndex) -> None:
+        painter.save()
+        painter.set_render_hint(qtg.QPainter.Antialiasing)
+        rect = option.rect.adjusted(2, 2, -2, -2)
+        completed = index.data(LevelsModel.COMPLETED_ROLE)
+        color = qtg.QColor(colors.GREEN_COLOR if completed else colors.WHITE_COLOR)
+        hovered = option.state & qtw.QStyle.State_MouseOver
+        painter.set_pen(qtg.QPen(color, 2 if hovered else 1))
+        painter.set_brush(qtg.QColor(colors.DARK_GRAY_COLOR if hovered else colors.BACKGROUND_COLOR))
+        painter.draw_rounded_rect(rect, 4, 4)
+        painter.set_font(fonts.BUTTON_FONT)
+        score = index.data(LevelsModel.SCORE_ROLE)
+        text_rect = rect.adjusted(0, 0, 0, -rect.height() // 4) if score is not None else rect
+        painter.draw_text(text_rect, qtc.Qt.AlignCenter, index.data(qtc.Qt.DisplayRole))
+        if score is not None:
+            painter.set_font(fonts.TYPER_STATISTICS_FONT)
+            painter.draw_text(rect.adjusted(0, rect.height() // 2, 0, 0), qtc.Qt.AlignCenter, str(score))
+        painter.restore()
+
+    def size_hint(self, option: qtw.QStyleOptionViewItem, index: qtc.QModelIndex) -> qtc.QSize:
+        return qtc.QSize(sizes.LEVEL_CELL_SIZE, sizes.LEVEL_CELL_SIZE)
 
 
-class LevelsList(qtw.QFrame):
+class LevelsView(qtw.QListView):
     """
-    LevelsList is a list of all levels, inherits QFrame
-    Does not take any parameters
+    LevelsView is a grid of the levels, inherits QListView
+    Only the visible levels are painted and asked for data, so the grid is created at once for any number of levels,
+    a level is run on click
+
+    Parameters:
+        model (LevelsModel): the levels
     """
-    def __init__(self):
+    def __init__(self, model: LevelsModel):
         super().__init__()
-        layout = qtw.QVBoxLayout()
-        layout.set_alignment(qtc.Qt.AlignmentFlag.AlignVCenter)
-        for name, first, last in level_list.LEVEL_LIST:
-            self.add_group_of_levels(layout, name, first, last)
-        self.set_layout(layout)
+        self.flow = qtw.QListView.LeftToRight  # a wrapped list is laid out as a grid of uniform cells
+        self.is_wrapping = True
+        self.resize_mode = qtw.QListView.Adjust
+        self.layout_mode = qtw.QListView.Batched
+        self.uniform_item_sizes = True
+        self.grid_size = qtc.QSize(sizes.LEVEL_CELL_SIZE + 6, sizes.LEVEL_CELL_SIZE + 6)
+        self.mouse_tracking = True
+        self.selection_mode = qtw.QAbstractItemView.NoSelection
+        self.set_style_sheet(f'background-color: {colors.BACKGROUND_COLOR}; color: {colors.WHITE_COLOR}')
+        self.set_item_delegate(LevelDelegate(self))
+        self.set_model(model)
+        self.clicked.connect(self.run_level)
 
     @staticmethod
-    def add_group_of_levels(layout: qtw.QLayout, title: str, first: int, last: int) -> None:
-        title_label = qtw.QLabel(text=title)
-        title_label.font = fonts.HEADER_FONT
-        title_label.set_style_sheet(f'color: {colors.GREEN_COLOR}')
-        layout.add_widget(title_label)
-        layout.add_widget(BlockOfLevels(first, last))
+    def run_level(index: qtc.QModelIndex) -> None:
+        MainWindowActions().level_run_function(index.data(LevelsModel.PATH_ROLE))
 
 
 class LevelsMenuPage(BasePage):
     """
     LevelsMenuPage is a page for level selection menu, inherits BasePage
+    The levels are shown by groups chosen with the tabs and filtered by the search query,
+    the search is enabled when the levels are indexed, the results are read again every time the page is shown
     Does not take any parameters
+
+    Attributes:
+        levels (LevelsModel): the levels of the chosen group matching the query
+        tabs (QTabBar): the groups
+        search (QLineEdit): the search query
     """
     def __init__(self):
         super().__init__()
+        self.levels = LevelsModel()
+        self.tabs = qtw.QTabBar()
+        self.tabs.add_tab(texts.ALL_LEVELS_GROUP)
+        for group in self.levels.groups:
+            self.tabs.add_tab(group)
+        self.tabs.font = fonts.TYPER_STATUS_BAR_FONT
+        self.tabs.set_style_sheet(f'QTabBar::tab {{ color: {colors.WHITE_COLOR}; '
+                                  f'background: {colors.BACKGROUND_COLOR}; '
+                                  f'border: 1px solid {colors.GRAY_COLOR}; padding: 4px 12px; }} '
+                                  f'QTabBar::tab:selected {{ color: {colors.GREEN_COLOR}; }}')
+        self.tabs.currentChanged.connect(self.choose_group)
+        self.search = qtw.QLineEdit()
+        self.search.placeholder_text = texts.SEARCH_PLACEHOLDER
+        self.search.font = fonts.TYPER_STATUS_BAR_FONT
+        self.search.set_style_sheet(f'color: {colors.WHITE_COLOR}; background: {colors.BACKGROUND_COLOR}; '
+                                    f'border: 1px solid {colors.GRAY_COLOR}; padding: 3px;')
+        self.search.set_fixed_width(sizes.SEARCH_WIDTH)
+        self.search.enabled = self.levels.indexed
+        self.search.textChanged.connect(self.levels.set_query)
+        self.levels.levels_indexed.connect(self.show_indexed)
+        bar = qtw.QHBoxLayout()
+        bar.add_widget(self.tabs, 1)
+        bar.add_widget(self.search)
         layout = qtw.QVBoxLayout()
-        layout.set_alignment(qtc.Qt.AlignmentFlag.AlignVCenter)
         layout.add_widget(BaseHeader(texts.LEVELS_HEADER))
-        scroll = qtw.QScrollArea()
-        scroll.set_widget(LevelsList())
-        layout.add_widget(scroll)
+        layout.add_layout(bar)
+        layout.add_widget(LevelsView(self.levels))
         self.set_layout(layout)
+
+    def choose_group(self, tab: int) -> None:
+        """
+        Shows only the levels of the group of the tab, all the levels for the first tab
+        Parameters:
+            tab (int): the index of the tab
+        """
+        self.levels.set_group(self.levels.groups[tab - 1] if tab > 0 else None)
+
+    def show_indexed(self) -> None:
+        """
+        Makes the tabs of the groups of the indexed levels, keeps the group chosen, enables the search
+        """
+        self.tabs.block_signals(True)
+        while self.tabs.count > 1:
+            self.tabs.remove_tab(1)
+        for group in self.levels.groups:
+            self.tabs.add_tab(group)
+        self.tabs.current_index = self.levels.groups.index(self.levels.group) + 1 if self.levels.group else 0
+        self.tabs.block_signals(False)
+        self.search.enabled = True
+
+    def show_event(self, event) -> None:
+        """
+        Overloaded virtual function, updates the results of the levels
+        """
+        self.levels.refresh()
+        super().show_event(event)
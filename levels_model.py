@@ -0,0 +1,175 @@
+from PySide6 import QtCore as qtc
+from __feature__ import snake_case, true_property
+
+import os
+
+from constraints import texts, level_list
+from level_catalog import LevelCatalog
+from level_index import LevelIndex
+from level_indexer import LevelIndexer
+from profile_manager import ProfileManager
+from typing_session import TypingSession
+
+
+class LevelsModel(qtc.QAbstractListModel):
+    """
+    LevelsModel is the list of the levels of the levels directory and the uploaded levels for the levels menu,
+    inherits QAbstractListModel
+    Every level belongs to a group of level_list.LEVEL_LIST by its number, the other levels are in
+    texts.OTHER_LEVELS_GROUP. The titles and the best scores are read only for the levels the view shows,
+    the results of the attempts are taken from the attempt store of the active profile on refresh.
+    The model shows the levels of one group or all of them matching the search query of LevelIndex,
+    the filtering is done by the model itself, so changing the filter does not call the model for every level.
+    The model starts with the levels of the last update of LevelIndexer, the levels directory before the first one,
+    and requests an update. After every update the invalid levels are dropped, the uploaded levels are added,
+    the search is available and the signal levels_indexed is emitted
+    Does not take any parameters
+
+    Attributes:
+        paths (list[str]): paths to the files of all the levels in order
+        indexed (bool): whether the levels were taken from the updated LevelIndex
+        groups (list[str]): the group names in order, only the groups having levels
+        level_groups (list[str]): the group of each level
+        group (str | None): the group shown, None to show all the groups
+        found (set[str] | None): the levels found by the search query, None without a query
+        rows (list[int]): the indices in paths of the shown levels
+        results (dict[str, LevelResult]): the results of the attempted levels by path
+        scores (dict[str, int | None]): the best scores already calculated, None if the level is not valid anymore
+    """
+    PATH_ROLE = qtc.Qt.UserRole
+    GROUP_ROLE = qtc.Qt.UserRole + 1
+    SCORE_ROLE = qtc.Qt.UserRole + 2
+    COMPLETED_ROLE = qtc.Qt.UserRole + 3
+    levels_indexed = qtc.Signal()
+
+    def __init__(self):
+        super().__init__()
+        indexer = LevelIndexer()
+        self.indexed = indexer.paths is not None
+        self.paths = indexer.paths if self.indexed else LevelCatalog().get_paths()
+        self.level_groups, self.groups = self.make_groups(self.paths)
+        self.group = None
+        self.found = None
+        self.rows = list(range(len(self.paths)))
+        self.results = {}
+        self.scores = {}
+        indexer.levels_indexed.connect(self.set_paths, qtc.Qt.QueuedConnection)
+        indexer.update()
+
+    @staticmethod
+    def make_groups(paths: list[str]) -> tuple[list[str], list[str]]:
+        """
+        Finds the group of every level
+        Parameters:
+            paths (list[str]): paths to the files of the levels
+        Returns:
+            level_groups (list[str]): the group of each level
+            groups (list[str]): the group names in order, only the groups having levels
+        """
+        numbered = {texts.LEVEL_PATH_FIRST + f'{i:02d}' + texts.LEVEL_PATH_LAST: name
+                    for name, first, last in level_list.LEVEL_LIST for i in range(first, last)}
+        level_groups = [numbered.get(path, texts.OTHER_LEVELS_GROUP) for path in paths]
+        present = set(level_groups)
+        groups = [name for name, _, _ in level_list.LEVEL_LIST if name in present]
+        if texts.OTHER_LEVELS_GROUP in present:
+            groups.append(texts.OTHER_LEVELS_GROUP)
+        return level_groups, groups
+
+    def set_paths(self, paths: list[str]) -> None:
+        """
+        Shows the levels of the updated LevelIndex, the group shown is reset in case it has no levels anymore,
+        it is called by LevelIndexer.levels_indexed
+        Parameters:
+            paths (list[str]): paths to the files of the levels, see LevelIndex.update
+        """
+        self.paths = paths
+        self.indexed = True
+        self.level_groups, self.groups = self.make_groups(paths)
+        if self.group not in self.groups:
+            self.group = None
+        self.filter_rows()
+        self.levels_indexed.emit()
+
+    def row_count(self, parent: qtc.QModelIndex = qtc.QModelIndex()) -> int:
+        return 0 if parent.is_valid() else len(self.rows)
+
+    def data(self, index: qtc.QModelIndex, role: int = qtc.Qt.DisplayRole):
+        if not index.is_valid():
+            return None
+        level = self.rows[index.row()]
+        path = self.paths[level]
+        if role == qtc.Qt.DisplayRole:
+            name = os.path.basename(path)[:-len(texts.LEVEL_PATH_LAST)]
+            return name.removeprefix(os.path.basename(texts.LEVEL_PATH_FIRST)) or name
+        if role == qtc.Qt.ToolTipRole:
+            parsed = LevelCatalog().get_level(path)
+            return parsed.title if parsed is not None else texts.ERROR_INVALID_FILE
+        if role == self.PATH_ROLE:
+            return path
+        if role == self.GROUP_ROLE:
+            return self.level_groups[level]
+        if role == self.SCORE_ROLE:
+            return self.get_score(path)
+        if role == self.COMPLETED_ROLE:
+            return path in self.results
+        return None
+
+    def set_group(self, group: str | None) -> None:
+        """
+        Shows only the levels of the group
+        Parameters:
+            group (str | None): the name of the group, None to show all the levels
+        """
+        self.group = group
+        self.filter_rows()
+
+    def set_query(self, query: str) -> None:
+        """
+        Shows only the levels matching the search query, see LevelIndex.parse_query
+        Parameters:
+            query (str): the query, an empty one shows all the levels
+        """
+        self.found = LevelIndex().search(query) if query.strip() else None
+        self.filter_rows()
+
+    def filter_rows(self) -> None:
+        """
+        Chooses the levels of the group matching the query
+        """
+        self.begin_reset_model()
+        group, found = self.group, self.found
+        self.rows = [i for i, (path, level_group) in enumerate(zip(self.paths, self.level_groups))
+                     if (group is None or level_group == group) and (found is None or path in found)]
+        self.end_reset_model()
+
+    def get_score(self, path: str) -> int | None:
+        """
+        Returns the best score of the attempts of the level, calculates it on the first call after refresh
+        Parameters:
+            path (str): path to the file of the level
+        Returns:
+            score (int | None): None in case the level was not completed
+        """
+        if path not in self.results:
+            return None
+        if path not in self.scores:
+            level = LevelCatalog().get_level(path)
+            store = ProfileManager().get_calculator().get_store()
+            if level is None or store is None:
+                self.scores[path] = None
+            else:
+                self.scores[path] = max((TypingSession.get_score(speed, level.goal_speed, accuracy,
+                                                                 level.goal_accuracy)
+                                         for speed, accuracy in store.get_level_attempts(path)), default=None)
+        return self.scores[path]
+
+    def refresh(self) -> None:
+        """
+        Reads the results of the active profile again, the views are updated
+        """
+        store = ProfileManager().get_calculator().get_store()
+        self.results = store.get_level_results() if store is not None else {}
+        self.scores = {}
+        if self.rows:
+            self.dataChanged.emit(self.index(0), self.index(len(self.rows) - 1),
+                                  [self.SCORE_ROLE, self.COMPLETED_ROLE])
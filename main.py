@@ -1,14 +1,83 @@
-from PySide6 import QtWidgets as qtw
-from __feature__ import snake_case, true_property
+from startup_profiler import StartupProfiler
+import argparse
 import sys
-from main_window import MainWindow
+import threading
+from functools import partial
+from constraints import texts
+
+
+def load_statistics() -> None:
+    """
+    Loads the statistics of the active profile, it is called on a background thread after the first window is shown,
+    so the statistics are loaded by the time they are needed without delaying the startup
+    """
+    with StartupProfiler().measure('statistics load (background)'):
+        from profile_manager import ProfileManager
+        ProfileManager().get_calculator()
+
+
+def rank_levels() -> None:
+    """
+    Updates the level index and ranks the levels for the recommendations, it is called on a background thread
+    after the first window is shown, so finishing the first level does not wait for it
+    """
+    with StartupProfiler().measure('levels ranking (background)'):
+        from level_recommender import LevelRecommender
+        LevelRecommender().update()
+
+
+def on_first_window(app, profile: bool) -> None:
+    """
+    Starts loading the statistics and ranking the levels in background when the first window is shown
+    In the profile mode waits for them, prints the durations of the startup steps and quits,
+    otherwise stops the profiler
+    Parameters:
+        app (QApplication): the application
+        profile (bool): whether the startup is profiled
+    """
+    profiler = StartupProfiler()
+    profiler.mark('first window shown')
+    loader = threading.Thread(target=load_statistics, name='statistics-loader', daemon=True)
+    loader.start()
+    ranker = threading.Thread(target=rank_levels, name='levels-ranker', daemon=True)
+    ranker.start()
+    if profile:
+        loader.join()
+        ranker.join()
+        print(profiler.make_report())
+        app.quit()
+    else:
+        profiler.stop()
 
 
 def main():
-    app = qtw.QApplication(sys.argv)
-    window = MainWindow()
-    window.show()
+    if sys.argv[1:2] == ['check']:  # the headless check of a level pack, Qt is not imported
+        from level_pack import main as check
+        sys.exit(check(sys.argv[2:]))
+    parser = argparse.ArgumentParser(description=texts.TITLE,
+                                     epilog='run "main.py check DIRECTORY" to validate a directory of levels')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='print the durations of the imports and constructions of the startup and exit')
+    args, qt_args = parser.parse_known_args()
+    profiler = StartupProfiler()
+    with profiler.measure('import PySide6'):
+        from PySide6 import QtWidgets as qtw, QtCore as qtc
+        from __feature__ import snake_case, true_property
+    with profiler.measure('import main_window'):
+        from main_window import MainWindow
+    with profiler.measure('QApplication'):
+        app = qtw.QApplication(sys.argv[:1] + qt_args)
+    with profiler.measure('MainWindow'):
+        window = MainWindow()
+    with profiler.measure('show'):
+        window.show()
+    qtc.QTimer.single_shot(0, partial(on_first_window, app, args.profile_startup))
     app.exec()
+    if 'profile_manager' in sys.modules:  # the statistics are written in background, wait for them
+        from profile_manager import ProfileManager
+        manager = ProfileManager.get_instance()
+        if manager is not None:
+            manager.close()
 
 
 if __name__ == '__main__':
@@ -12,6 +12,9 @@ class MainMenuPage(BasePage):
     """
     MainMenuPage is a page for main menu, inherits BasePage
     Does not take any parameters
+
+    Attributes:
+        profiles (QComboBox): the selector of the active profile
     """
     def __init__(self):
         super().__init__()
@@ -20,11 +23,55 @@ class MainMenuPage(BasePage):
         layout.add_stretch()
         layout.add_widget(self.make_logo())
         layout.add_widget(BaseButton(texts.LEVELS_BUTTON, MainWindowActions().levels_function))
+        layout.add_widget(BaseButton(texts.DRILL_BUTTON, MainWindowActions().drill_function))
         layout.add_widget(BaseButton(texts.STATISTICS_BUTTON, MainWindowActions().statistics_function))
         layout.add_widget(BaseButton(texts.UPLOAD_BUTTON, MainWindowActions().upload_function))
+        layout.add_widget(self.make_profile_selector(), alignment=qtc.Qt.AlignmentFlag.AlignCenter)
         layout.add_stretch()
         self.set_layout(layout)
 
+    def make_profile_selector(self) -> qtw.QFrame:
+        """
+        Creates the selector of the active profile and the button to create a new one
+        Returns:
+            selector (QFrame)
+        """
+        from profile_manager import ProfileManager
+        manager = ProfileManager()
+        self.profiles = qtw.QComboBox()
+        self.profiles.font = fonts.BUTTON_FONT
+        self.profiles.add_items(manager.get_profiles())
+        self.profiles.current_text = manager.active
+        self.profiles.currentTextChanged.connect(MainWindowActions().profile_function)
+        label = qtw.QLabel(text=texts.PROFILE_TEXT)
+        label.font = fonts.BUTTON_FONT
+        label.set_style_sheet(f'color: {colors.WHITE_COLOR}')
+        layout = qtw.QHBoxLayout()
+        layout.contents_margins = qtc.QMargins(0, 0, 0, 0)
+        layout.add_widget(label)
+        layout.add_widget(self.profiles)
+        layout.add_widget(BaseButton(texts.NEW_PROFILE_BUTTON, self.create_profile))
+        selector = qtw.QFrame()
+        selector.set_layout(layout)
+        return selector
+
+    def create_profile(self) -> None:
+        """
+        Asks the name of a new profile, creates it and makes it active
+        In case the name is not valid, shows message box
+        """
+        name, accepted = qtw.QInputDialog.get_text(self, texts.PROFILE_TEXT, texts.NEW_PROFILE_TEXT)
+        if not accepted:
+            return
+        from profile_manager import ProfileManager
+        if not ProfileManager().create_profile(name):
+            message = qtw.QMessageBox()
+            message.critical(self, 'Error', texts.ERROR_PROFILE_NAME)
+            return
+        if self.profiles.find_text(name) == -1:
+            self.profiles.add_item(name)
+        self.profiles.current_text = name
+
     @staticmethod
     def make_logo() -> qtw.QLabel:
         """
@@ -1,17 +1,15 @@
 from PySide6 import QtWidgets as qtw, QtCore as qtc
 from __feature__ import snake_case, true_property
+import threading
 from enum import Enum
 from functools import partial
 from constraints import sizes, texts
 from base_button import BaseButton
 from base_page import BasePage
 from main_window_actions import MainWindowActions
-from typing_page import TypingPage
-from main_menu_page import MainMenuPage
-from levels_menu_page import LevelsMenuPage
-from statistics_page import StatisticsPage
-from upload_level_page import UploadLevelPage
-from level_validator import LevelValidator
+from level_catalog import LevelCatalog
+from level_validator import LevelError
+from startup_profiler import StartupProfiler
 
 
 class State(Enum):
@@ -31,6 +29,8 @@ class MainWindow(qtw.QMainWindow):
     Does not take any parameters
     Attributes:
         state (State): current state
+        level_to_load (Level | None): the level to run
+        pages (dict[State, BasePage]): the pages already created, they are reused until invalidated
         container (QFrame): widget containing current page
         home_button (BaseButton): button to go to main page
     """
@@ -40,6 +40,7 @@ class MainWindow(qtw.QMainWindow):
         self.set_fixed_size(qtc.QSize(sizes.WINDOW_WIDTH, sizes.WINDOW_HEIGHT))
         self.state = State.MAIN_MENU
         self.level_to_load = None
+        self.pages = {}
         self.setup_main_window_actions()
         layout = qtw.QStackedLayout()
         self.container = qtw.QFrame(parent=self)
@@ -63,34 +64,61 @@ class MainWindow(qtw.QMainWindow):
         actions.restart_function = partial(MainWindow.load_state, self)
         actions.level_run_function = partial(MainWindow.run_level, self)
         actions.next_level_function = partial(MainWindow.run_next_level, self)
+        actions.statistics_changed_function = partial(MainWindow.invalidate, self, State.STATISTICS)
+        actions.drill_function = partial(MainWindow.run_drill, self)
+        actions.profile_function = partial(MainWindow.switch_profile, self)
 
     def make_page_by_state(self) -> BasePage:
         """
-        Creates a page by current state
+        Creates a page by current state, the module of the page is imported on its first use,
+        so the startup does not wait for the pages not shown yet
         Raises:
             ValueError: not correct state
         Returns:
             page (BasePage), an instance of a necessary page
         """
-        if self.state == State.MAIN_MENU:
-            return MainMenuPage()
-        elif self.state == State.LEVELS_MENU:
-            return LevelsMenuPage()
-        elif self.state == State.RUN_LEVEL:
-            return TypingPage(self.level_to_load)
-        elif self.state == State.STATISTICS:
-            return StatisticsPage()
-        elif self.state == State.UPLOAD_LEVEL:
-            return UploadLevelPage()
-        else:
-            raise ValueError("MainWindow.state should be one of the State options")
+        with StartupProfiler().measure(f'page {self.state.name}'):
+            if self.state == State.MAIN_MENU:
+                from main_menu_page import MainMenuPage
+                return MainMenuPage()
+            elif self.state == State.LEVELS_MENU:
+                from levels_menu_page import LevelsMenuPage
+                return LevelsMenuPage()
+            elif self.state == State.RUN_LEVEL:
+                from typing_page import TypingPage
+                return TypingPage(self.level_to_load)
+            elif self.state == State.STATISTICS:
+                from statistics_page import StatisticsPage
+                return StatisticsPage()
+            elif self.state == State.UPLOAD_LEVEL:
+                from upload_level_page import UploadLevelPage
+                return UploadLevelPage()
+            else:
+                raise ValueError("MainWindow.state should be one of the State options")
+
+    def invalidate(self, state: State) -> None:
+        """
+        Drops the created page of the state, it will be created again when needed
+        Parameters:
+            state (State): the state of the page
+        """
+        page = self.pages.pop(state, None)
+        if page is None:
+            return
+        self.container.layout().remove_widget(page)
+        page.delete_later()
 
     def load_state(self) -> None:
         """
-        Reloads current page, shows or hides home button
+        Shows the page of current state, creates it if it is not created yet, shows or hides home button
+        The level page is created every time, so that the level is restarted
         """
-        cur = self.make_page_by_state()
-        self.container.layout().add_widget(cur)
+        self.invalidate(State.RUN_LEVEL)
+        cur = self.pages.get(self.state)
+        if cur is None:
+            cur = self.make_page_by_state()
+            self.pages[self.state] = cur
+            self.container.layout().add_widget(cur)
         self.container.layout().set_current_widget(cur)
         if self.state == State.MAIN_MENU:
             self.home_button.hide()
@@ -102,27 +130,52 @@ class MainWindow(qtw.QMainWindow):
         Switches page to level page and runs level located at file_path
         Parameters:
             file_path (str): path to file to load
-        In case file_path is incorrect, shows message box
+        In case file_path is incorrect, shows message box with the reason
+        """
+        level = LevelCatalog().load_level(file_path)
+        if isinstance(level, LevelError):
+            message = qtw.QMessageBox()
+            message.critical(self, 'Error', f'{texts.ERROR_INVALID_FILE}\n{level}')
+            return
+        self.level_to_load = level
+        self.switch_to(State.RUN_LEVEL)
+
+    def switch_profile(self, name: str) -> None:
+        """
+        Makes the profile active, drops the statistics page and starts loading the statistics of the profile
+        in background
+        Parameters:
+            name (str): the name of the profile
         """
-        if not LevelValidator.is_level_valid(file_path):
+        from profile_manager import ProfileManager
+        manager = ProfileManager()
+        manager.switch(name)
+        self.invalidate(State.STATISTICS)
+        threading.Thread(target=manager.get_calculator, name='profile-loader', daemon=True).start()
+
+    def run_drill(self) -> None:
+        """
+        Switches page to level page and runs a drill made of the weakest symbols of the user
+        In case there are no levels to make the drill of, shows message box
+        """
+        from drill_generator import DrillGenerator
+        level = DrillGenerator().generate()
+        if level is None:
             message = qtw.QMessageBox()
-            message.critical(self, 'Error', texts.ERROR_INVALID_FILE)
+            message.critical(self, 'Error', texts.ERROR_NO_DRILL)
             return
-        self.level_to_load = file_path
+        self.level_to_load = level
         self.switch_to(State.RUN_LEVEL)
 
     def run_next_level(self) -> None:
         """
         Loads the next level
-        In case current level is not one of the pre-made levels, does nothing
+        In case current level is not one of the pre-made levels or it is the last one, does nothing
         """
-        if self.level_to_load[:len(texts.LEVEL_PATH_FIRST)] != texts.LEVEL_PATH_FIRST:
-            return
-        if self.level_to_load[-len(texts.LEVEL_PATH_LAST):] != texts.LEVEL_PATH_LAST:
+        next_path = LevelCatalog().get_next_path(self.level_to_load.path)
+        if next_path is None:
             return
-        cur_level_number = int(self.level_to_load[len(texts.LEVEL_PATH_FIRST):-len(texts.LEVEL_PATH_LAST)])
-        next_level = texts.LEVEL_PATH_FIRST + f'{cur_level_number + 1:02d}' + texts.LEVEL_PATH_LAST
-        self.run_level(next_level)
+        self.run_level(next_path)
 
     def switch_to(self, new_state: State) -> None:
         """
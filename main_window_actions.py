@@ -14,3 +14,6 @@ class MainWindowActions(metaclass=Singleton):
         self.restart_function = None
         self.level_run_function = None
         self.next_level_function = None
+        self.statistics_changed_function = None
+        self.drill_function = None
+        self.profile_function = None
@@ -0,0 +1,133 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from singleton import Singleton
+from constraints import limits, texts
+
+
+class ProfileManager(metaclass=Singleton):
+    """
+    ProfileManager is a singleton keeping the named profiles of users, every profile has its own statistics
+    The default profile keeps its files in texts.SAVES_DIRECTORY, the others in their directories
+    in texts.PROFILES_DIRECTORY. Only the active profile is loaded, at most limits.PROFILE_CACHE_SIZE recently used
+    profiles are kept in memory, the least recently used one is closed on a background thread,
+    the profile is loaded again only after it is closed, so its files are never written by two writers
+    Switching the profile only changes the name, its statistics are loaded when they are needed,
+    the statistics modules with NumPy and SQLite are imported only then, so listing the profiles is cheap
+    Does not take any parameters
+
+    Attributes:
+        active (str): the name of the active profile
+        calculators (OrderedDict[str, StatisticsCalculator]): the loaded profiles from the least recently used
+        lock (RLock): guards the loaded profiles, the active one may be loaded on a background thread
+        closing (dict[str, Thread]): the threads closing the evicted profiles by their names
+    """
+    NAME = re.compile(r'[A-Za-z0-9_-]{1,32}')
+
+    def __init__(self):
+        self.calculators = OrderedDict()
+        self.lock = threading.RLock()
+        self.closing = {}
+        try:
+            with open(texts.ACTIVE_PROFILE_PATH, 'r') as file:
+                self.active = file.read().strip()
+        except (OSError, UnicodeDecodeError):
+            self.active = texts.DEFAULT_PROFILE
+        if self.active not in self.get_profiles():
+            self.active = texts.DEFAULT_PROFILE
+
+    @staticmethod
+    def get_directory(name: str) -> str:
+        """
+        Returns the directory of the profile files
+        Parameters:
+            name (str): the name of the profile
+        Returns:
+            directory (str)
+        """
+        if name == texts.DEFAULT_PROFILE:
+            return texts.SAVES_DIRECTORY
+        return os.path.join(texts.PROFILES_DIRECTORY, name)
+
+    def get_profiles(self) -> list[str]:
+        """
+        Returns the names of all the profiles, the default one first
+        Returns:
+            names (list[str])
+        """
+        try:
+            with os.scandir(texts.PROFILES_DIRECTORY) as entries:
+                names = sorted(entry.name for entry in entries
+                               if entry.is_dir() and self.NAME.fullmatch(entry.name)
+                               and entry.name != texts.DEFAULT_PROFILE)
+        except OSError:
+            names = []
+        return [texts.DEFAULT_PROFILE] + names
+
+    def create_profile(self, name: str) -> bool:
+        """
+        Creates the directory of a new profile, does nothing if the profile exists
+        Parameters:
+            name (str): the name of the profile
+        Returns:
+            success (bool): False in case the name is not valid or the directory can not be created
+        """
+        if not self.NAME.fullmatch(name):
+            return False
+        try:
+            os.makedirs(self.get_directory(name), exist_ok=True)
+        except OSError:
+            return False
+        return True
+
+    def switch(self, name: str) -> None:
+        """
+        Makes the profile active and remembers it for the next start, the profile is not loaded
+        Parameters:
+            name (str): the name of an existing profile
+        """
+        self.active = name
+        try:
+            with open(texts.ACTIVE_PROFILE_PATH, 'w') as file:
+                file.write(name)
+        except OSError:
+            pass
+
+    def get_calculator(self) -> 'StatisticsCalculator':
+        """
+        Returns the statistics of the active profile, loads them if they are not in memory
+        Returns:
+            calculator (StatisticsCalculator)
+        """
+        with self.lock:
+            name = self.active
+            calculator = self.calculators.get(name)
+            if calculator is not None:
+                self.calculators.move_to_end(name)
+                return calculator
+            from statistics_calculator import StatisticsCalculator
+            closing = self.closing.pop(name, None)
+            if closing is not None:
+                closing.join()
+            legacy_path = texts.STATISTICS_PATH if name == texts.DEFAULT_PROFILE else None
+            calculator = StatisticsCalculator(self.get_directory(name), legacy_path)
+            self.calculators[name] = calculator
+            if len(self.calculators) > limits.PROFILE_CACHE_SIZE:
+                evicted_name, evicted = self.calculators.popitem(last=False)
+                thread = threading.Thread(target=evicted.close, name='profile-closer', daemon=True)
+                thread.start()
+                self.closing = {closed: closer for closed, closer in self.closing.items() if closer.is_alive()}
+                self.closing[evicted_name] = thread
+            return calculator
+
+    def close(self) -> None:
+        """
+        Waits for the statistics of all the profiles to be written, should be called on exit
+        """
+        with self.lock:
+            for calculator in self.calculators.values():
+                calculator.close()
+            for thread in self.closing.values():
+                thread.join()
@@ -1,10 +1,28 @@
+import threading
+
+
 class Singleton(type):
     """
-    Singleton is a metaclass for singleton classes
+    Singleton is a metaclass for singleton classes, the instance is created once even if it is requested
+    from several threads
     """
     _instances = {}
+    _locks = {}
+    _locks_lock = threading.Lock()
 
     def __call__(cls, *args, **kwargs):
-        if cls not in cls._instances:
-            cls._instances[cls] = super(Singleton, cls).__call__(*args, **kwargs)
+        if cls not in cls._instances:  # the instance may be created on a background thread at the same time
+            with Singleton._locks_lock:
+                lock = Singleton._locks.setdefault(cls, threading.RLock())
+            with lock:
+                if cls not in cls._instances:
+                    cls._instances[cls] = super(Singleton, cls).__call__(*args, **kwargs)
         return cls._instances[cls]
+
+    def get_instance(cls):
+        """
+        Returns the instance of the class without creating it
+        Returns:
+            instance: the instance, None in case it was not created yet
+        """
+        return cls._instances.get(cls)
@@ -0,0 +1,65 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from singleton import Singleton
+
+
+class StartupProfiler(metaclass=Singleton):
+    """
+    StartupProfiler is a singleton collecting the durations of the startup steps: imports and constructions
+    Measuring is cheap, so the steps are always measured until the end of the startup, see stop,
+    the report is printed only in the profile mode
+    Does not take any parameters
+
+    Attributes:
+        start (float): perf_counter of the profiler creation, the beginning of the startup
+        steps (list[tuple[str, float, float]]): name, beginning and duration of each measured step in seconds
+        active (bool): whether the steps are recorded
+    """
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.steps = []
+        self.active = True
+
+    def stop(self) -> None:
+        """
+        Stops recording the steps, so the steps measured after the startup do not pile up
+        """
+        self.active = False
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """
+        Measures the duration of the code inside the with block, does nothing after stop
+        Parameters:
+            name (str): name of the step
+        """
+        if not self.active:
+            yield
+            return
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((name, begin - self.start, time.perf_counter() - begin))
+
+    def mark(self, name: str) -> None:
+        """
+        Records the moment as a step without duration, does nothing after stop
+        Parameters:
+            name (str): name of the moment
+        """
+        if self.active:
+            self.steps.append((name, time.perf_counter() - self.start, 0.0))
+
+    def make_report(self) -> str:
+        """
+        Makes the table of the steps in order of their beginning
+        Returns:
+            report (str)
+        """
+        lines = [f'{"step":<40} {"at, ms":>10} {"took, ms":>10}']
+        for name, begin, duration in sorted(self.steps, key=lambda step: step[1]):
+            lines.append(f'{name:<40} {begin * 1000:>10.1f} {duration * 1000:>10.1f}')
+        return '\n'.join(lines)
@@ -1,54 +1,169 @@
-from singleton import Singleton
+import os
 import pickle
+import threading
+import numpy as np
 from collections import Counter
-from constraints import texts
+from constraints import limits, texts
+from statistics_log import StatisticsLog
+from statistics_writer import StatisticsWriter
+from attempt_store import AttemptStore
+from key_timings import LatencyStats
+from symbol_statistics import SymbolStatistics
 
 
-class StatisticsCalculator(metaclass=Singleton):
+class StatisticsCalculator:
     """
-    StatisticsCalculator is a singleton collecting statistics about right and wrong types of each symbol
-    It stores data in texts.STATISTICS_PATH with pickle
-    Does not take any parameters
+    StatisticsCalculator is collecting statistics of a profile about right and wrong types of each symbol
+    Every finished attempt is appended to the log texts.STATISTICS_LOG_FILE in the profile directory
+    by a background StatisticsWriter, which also keeps the snapshot of the totals texts.STATISTICS_SNAPSHOT_FILE,
+    so only the attempts logged after the snapshot are read on start. Without a snapshot, the totals stored
+    with pickle by the older versions are loaded as a starting point
+    Only the totals are kept in memory and in the snapshot, the history of the last attempts is read from the store
+    when it is needed, see get_accuracy_history
+    The attempts are also imported to the AttemptStore database texts.STATISTICS_DATABASE_FILE for queries
+    by the writer thread, the store is not given to the pages until the attempts of the previous runs are imported
+    The calculators are created and cached by ProfileManager
+
+    Parameters:
+        directory (str): the directory of the profile files
+        legacy_path (str | None): path to the totals stored with pickle by the older versions, None if there are none
 
     Attributes:
-        mistakes_counter (Counter[str, int]): Counter with number of mistakes made for each symbol
-        letter_counter (Counter[str, int]): Counter with number of correct types made for each symbol
+        directory (str)
+        legacy_path (str | None)
+        symbols (SymbolStatistics): numbers of correct types and mistakes of each symbol, without history
+        latency_sum (Counter[str, float]): total time in milliseconds spent to type each symbol and bigram
+        latency_count (Counter[str, int]): number of timed types of each symbol and bigram
+        log (StatisticsLog): the log of all attempts
+        lock (Lock): guards the totals while the writer thread takes a snapshot of them
+        records_added (int): number of attempts added since the start
+        store (AttemptStore | None): the database of the attempts, None if it can not be opened, see get_store
+        writer (StatisticsWriter): the writer of the log, the snapshot and the store
     """
-    def __init__(self):
-        self.mistakes_counter = Counter()
-        self.letter_counter = Counter()
-        self.load_stats_file()
+    SNAPSHOT_VERSION = 2
+
+    def __init__(self, directory: str, legacy_path: str | None = None):
+        self.directory = directory
+        self.legacy_path = legacy_path
+        self.symbols = SymbolStatistics()
+        self.latency_sum = Counter()
+        self.latency_count = Counter()
+        self.log = StatisticsLog(os.path.join(directory, texts.STATISTICS_LOG_FILE))
+        self.lock = threading.Lock()
+        self.records_added = 0
+        log_start = self.load_snapshot()
+        if log_start is None:
+            log_start = 0
+            self.load_stats_file()
+        self.load_stats_log(log_start)
+        self.store = AttemptStore.open(os.path.join(directory, texts.STATISTICS_DATABASE_FILE))
+        self.writer = StatisticsWriter(self.log, os.path.join(directory, texts.STATISTICS_SNAPSHOT_FILE),
+                                       self.make_snapshot, self.store, legacy_path)
 
-    def add_stats(self, mistakes_counter: Counter[str, int], letter_counter: Counter[str, int]) -> None:
+    def add_stats(self, mistakes_counter: Counter[str, int], letter_counter: Counter[str, int],
+                  level_id: str, speed: float, accuracy: float, latencies: dict[str, LatencyStats],
+                  recording: bytes = b'') -> None:
         """
-        Adds up the information about types, updates the saves file
+        Adds up the information about types, queues the attempt to be appended to the log
         Parameters:
             mistakes_counter (Counter[str, int]): Counter with number of mistakes made for each symbol
             letter_counter (Counter[str, int]): Counter with number of right types of each symbol
+            level_id (str): identifier of the level
+            speed (float): speed in Words Per Minute
+            accuracy (float): share of symbols typed correctly
+            latencies (dict[str, LatencyStats]): latency of symbols and bigrams in milliseconds
+            recording (bytes): the encoded KeystrokeRecording of the attempt, empty by default
+        """
+        record = self.log.make_record(level_id, speed, accuracy, letter_counter, mistakes_counter, latencies,
+                                      recording)
+        with self.lock:
+            self.symbols.add(letter_counter, mistakes_counter, keep_history=False)
+            self.add_latencies(latencies)
+            self.records_added += 1
+        self.writer.submit(record)
+
+    def add_latencies(self, latencies: dict[str, LatencyStats]) -> None:
+        """
+        Adds up the latencies of symbols and bigrams
+        Parameters:
+            latencies (dict[str, LatencyStats]): latency of symbols and bigrams in milliseconds
         """
-        self.mistakes_counter += mistakes_counter
-        self.letter_counter += letter_counter
-        self.update_stats_file()
+        for key, stats in latencies.items():
+            self.latency_sum[key] += stats.mean * stats.count
+            self.latency_count[key] += stats.count
 
     def load_stats_file(self) -> None:
         """
-        Loads the information from saves file
+        Loads the totals stored with pickle by the older versions
+        """
+        if self.legacy_path is None:
+            return
+        try:
+            with open(self.legacy_path, 'rb') as file:
+                data = pickle.load(file)
+        except (FileNotFoundError, AttributeError, EOFError, ImportError, IndexError):  # file was broken or empty
+            return
+        self.symbols.add(data[1], data[0], keep_history=False)
+
+    def load_snapshot(self) -> int | None:
+        """
+        Loads the totals from the snapshot
+        Returns:
+            log_start (int | None): the size of the log the snapshot covers, None if there is no valid snapshot
         """
-        with open(texts.STATISTICS_PATH, 'rb') as file:
-            try:
+        try:
+            with open(os.path.join(self.directory, texts.STATISTICS_SNAPSHOT_FILE), 'rb') as file:
                 data = pickle.load(file)
-                self.mistakes_counter = data[0]
-                self.letter_counter = data[1]
-            except (AttributeError, EOFError, ImportError, IndexError):  # in case file was broken or empty
-                self.mistakes_counter = Counter()
-                self.letter_counter = Counter()
+            if data['version'] not in (1, self.SNAPSHOT_VERSION) or data['log_size'] > self.log.get_size():
+                return None  # the log was replaced after the snapshot
+            self.symbols.set_state(data['symbols'])
+        except (OSError, EOFError, pickle.UnpicklingError, KeyError, TypeError, ValueError):  # broken snapshot
+            self.symbols = SymbolStatistics()
+            return None
+        self.latency_sum = Counter(data['latency_sum'])
+        self.latency_count = Counter(data['latency_count'])
+        return data['log_size']
 
-    def update_stats_file(self) -> None:
+    def make_snapshot(self, records_written: int, log_size: int) -> bytes | None:
         """
-        Updates the information in saves file
+        Pickles the totals, called by the writer thread. Only the totals are copied under the lock,
+        so the attempts are not blocked by pickling
+        Parameters:
+            records_written (int): number of attempts written to the log since the start
+            log_size (int): the size of the log after they were written
+        Returns:
+            data (bytes | None): the snapshot, None in case some added attempts are not written yet
+        """
+        with self.lock:
+            if records_written != self.records_added:
+                return None
+            state = {'version': self.SNAPSHOT_VERSION, 'log_size': log_size, 'symbols': self.symbols.get_state(),
+                     'latency_sum': dict(self.latency_sum), 'latency_count': dict(self.latency_count)}
+        return pickle.dumps(state)
+
+    def load_stats_log(self, start: int = 0) -> None:
+        """
+        Adds up the information of the attempts in the log
+        Parameters:
+            start (int): the offset in the log to read from, the beginning by default
         """
-        with open(texts.STATISTICS_PATH, 'wb') as file:
-            pickle.dump((self.mistakes_counter, self.letter_counter), file)
+        for record in self.log.read(start):
+            self.symbols.add(record.letter_counter, record.mistakes_counter, keep_history=False)
+            self.add_latencies(record.latencies)
+
+    def get_store(self) -> AttemptStore | None:
+        """
+        Returns the store for the queries
+        Returns:
+            store (AttemptStore | None): None in case there is no store or the attempts are still being imported
+        """
+        return self.store if self.writer.store_ready.is_set() else None
+
+    def close(self) -> None:
+        """
+        Waits for all the attempts to be written, should be called on exit
+        """
+        self.writer.close()
 
     def get_accuracy(self, symbol: str) -> float:
         """
@@ -57,7 +172,55 @@ class StatisticsCalculator(metaclass=Singleton):
             symbol (str): symbol for accuracy calculation
         In case the symbol was never typed, returns -1
         """
-        if symbol not in self.letter_counter:
+        return float(self.symbols.get_accuracy(symbol)[0])
+
+    def get_miss_rate(self, symbol: str) -> float:
+        """
+        Returns the miss rate - fraction of mistakes among the types of a symbol
+        Parameters:
+            symbol (str): symbol for miss rate calculation
+        In case the symbol was never typed, returns -1
+        """
+        index = self.symbols.get_indices(symbol)[0]
+        total = self.symbols.hits[index] + self.symbols.misses[index]
+        if not total:
+            return -1
+        return float(self.symbols.misses[index] / total)
+
+    def get_heatmap(self, symbols: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the accuracy and the heatmap color of each symbol, calculated at once
+        Parameters:
+            symbols (str): symbols to calculate
+        Returns:
+            accuracy (np.ndarray): accuracy of each symbol, -1 for symbols never typed
+            colors (np.ndarray): n x 3 matrix of RGB components
+        """
+        accuracy = self.symbols.get_accuracy(symbols)
+        return accuracy, self.symbols.get_colors(accuracy)
+
+    def get_accuracy_history(self, symbols: str, limit: int = limits.HISTORY_LENGTH) -> np.ndarray | None:
+        """
+        Returns the accuracy of each symbol in each of the last attempts, read from the store
+        Parameters:
+            symbols (str): symbols to calculate accuracy of
+            limit (int): maximal number of attempts
+        Returns:
+            accuracy (np.ndarray | None): attempt x symbol matrix from the oldest attempt to the newest,
+                                          -1 where the symbol was not typed, None in case the store is not ready
+        """
+        store = self.get_store()
+        if store is None:
+            return None
+        return store.get_symbol_statistics(limit).get_accuracy_history(symbols)
+
+    def get_latency(self, key: str) -> float:
+        """
+        Returns the mean time in milliseconds spent to type a symbol or a bigram
+        Parameters:
+            key (str): symbol or bigram
+        In case the key was never timed, returns -1
+        """
+        if not self.latency_count[key]:
             return -1
-        all_cnt = self.letter_counter[symbol] + self.mistakes_counter[symbol]
-        return self.letter_counter[symbol] / all_cnt
+        return self.latency_sum[key] / self.latency_count[key]
@@ -0,0 +1,210 @@
+import os
+import struct
+import time
+from collections import Counter
+from collections.abc import Iterator, Mapping
+from types import MappingProxyType
+from typing import NamedTuple
+
+from key_timings import LatencyStats
+
+
+class AttemptRecord(NamedTuple):
+    """
+    AttemptRecord is a finished attempt of a level as it is stored in the statistics log
+
+    Attributes:
+        level_id (str): identifier of the level, the path to its file
+        time_stamp (float): the moment the attempt was finished, seconds since the epoch
+        speed (float): speed in Words Per Minute
+        accuracy (float): share of symbols typed correctly
+        letter_counter (Counter[str, int]): Counter with number of correct types made for each symbol
+        mistakes_counter (Counter[str, int]): Counter with number of mistakes made for each symbol
+        latencies (Mapping[str, LatencyStats]): latency of symbols and bigrams, in milliseconds, read-only and
+                                                empty by default
+        recording (bytes): the encoded KeystrokeRecording of the attempt, empty if there is none
+    """
+    level_id: str
+    time_stamp: float
+    speed: float
+    accuracy: float
+    letter_counter: Counter
+    mistakes_counter: Counter
+    latencies: Mapping = MappingProxyType({})
+    recording: bytes = b''
+
+
+class StatisticsLog:
+    """
+    StatisticsLog is an append-only binary log of attempts, every attempt is written with a single append
+    Record layout, little-endian:
+        record size (uint32), version (uint8), time stamp (float64), speed (float32), accuracy (float32),
+        level id length (uint16), number of symbols (uint16), level id (UTF-8),
+        for each symbol: code point (uint32), correct types (uint32), mistakes (uint32),
+        number of latencies (uint16),
+        for each latency: key length (uint8), key (UTF-8), count (uint32), mean, p50, p95 (float32),
+        recording length (uint32), recording
+    Records of version 1 have no latencies, records of version 2 have no recording.
+    The record size does not include its own 4 bytes.
+    A record cut short by a crash is dropped when reading
+
+    Parameters:
+        file_path (str): path to the log file
+    """
+    VERSION = 3
+    SIZE = struct.Struct('<I')
+    HEADER = struct.Struct('<BdffHH')
+    SYMBOL = struct.Struct('<III')
+    LATENCIES_COUNT = struct.Struct('<H')
+    LATENCY = struct.Struct('<Ifff')
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    @classmethod
+    def encode(cls, record: AttemptRecord) -> bytes:
+        """
+        Encodes the record to bytes including its size prefix
+        Parameters:
+            record (AttemptRecord): attempt to encode
+        Returns:
+            data (bytes)
+        """
+        level_id = record.level_id.encode('utf-8')
+        symbols = record.letter_counter.keys() | record.mistakes_counter.keys()
+        body = [cls.HEADER.pack(cls.VERSION, record.time_stamp, record.speed, record.accuracy,
+                                len(level_id), len(symbols)), level_id]
+        for symbol in symbols:
+            body.append(cls.SYMBOL.pack(ord(symbol), record.letter_counter[symbol], record.mistakes_counter[symbol]))
+        body.append(cls.LATENCIES_COUNT.pack(len(record.latencies)))
+        for key, stats in record.latencies.items():
+            key = key.encode('utf-8')
+            body.append(bytes((len(key),)) + key + cls.LATENCY.pack(*stats))
+        body.append(cls.SIZE.pack(len(record.recording)))
+        body.append(record.recording)
+        body = b''.join(body)
+        return cls.SIZE.pack(len(body)) + body
+
+    @classmethod
+    def decode(cls, body: bytes | memoryview) -> AttemptRecord:
+        """
+        Decodes the record from its bytes without the size prefix
+        Parameters:
+            body (bytes): encoded record
+        Raises:
+            ValueError: unknown record version
+        Returns:
+            record (AttemptRecord)
+        """
+        version, time_stamp, speed, accuracy, id_length, symbols_count = cls.HEADER.unpack_from(body)
+        if version not in (1, 2, cls.VERSION):
+            raise ValueError(f'Unknown statistics log record version {version}')
+        offset = cls.HEADER.size
+        level_id = bytes(body[offset:offset + id_length]).decode('utf-8')
+        offset += id_length
+        letter_counter = Counter()
+        mistakes_counter = Counter()
+        for code, right, wrong in cls.SYMBOL.iter_unpack(body[offset:offset + symbols_count * cls.SYMBOL.size]):
+            if right:
+                letter_counter[chr(code)] = right
+            if wrong:
+                mistakes_counter[chr(code)] = wrong
+        offset += symbols_count * cls.SYMBOL.size
+        latencies = {}
+        if version > 1:
+            (latencies_count,) = cls.LATENCIES_COUNT.unpack_from(body, offset)
+            offset += cls.LATENCIES_COUNT.size
+            for _ in range(latencies_count):
+                key_length = body[offset]
+                key = bytes(body[offset + 1:offset + 1 + key_length]).decode('utf-8')
+                offset += 1 + key_length
+                latencies[key] = LatencyStats(*cls.LATENCY.unpack_from(body, offset))
+                offset += cls.LATENCY.size
+        recording = b''
+        if version > 2:
+            (recording_length,) = cls.SIZE.unpack_from(body, offset)
+            offset += cls.SIZE.size
+            if offset + recording_length > len(body):
+                raise ValueError('The recording is cut short')
+            recording = bytes(body[offset:offset + recording_length])
+        return AttemptRecord(level_id, time_stamp, speed, accuracy, letter_counter, mistakes_counter, latencies,
+                             recording)
+
+    def append(self, records: list[AttemptRecord]) -> int:
+        """
+        Appends the records to the end of the log with a single write
+        Parameters:
+            records (list[AttemptRecord]): attempts to save
+        Raises:
+            OSError: the log can not be written
+        Returns:
+            size (int): the size of the log after the write
+        """
+        with open(self.file_path, 'ab') as file:
+            file.write(b''.join(map(self.encode, records)))
+            return file.tell()
+
+    def read(self, start: int = 0) -> Iterator[AttemptRecord]:
+        """
+        Reads all the complete records of the log in order they were written
+        A record which can not be decoded, for example one written by a newer version, is skipped and kept in the log.
+        In case the log ends with a record cut short by a crash, cuts it off so the next append starts
+        at a record boundary
+        Parameters:
+            start (int): the offset of the first record to read, the beginning of the log by default
+        Returns:
+            records (Iterator[AttemptRecord])
+        """
+        try:
+            with open(self.file_path, 'rb') as file:
+                file.seek(start)
+                data = memoryview(file.read())
+        except FileNotFoundError:
+            return
+        offset = 0
+        while offset + self.SIZE.size <= len(data):
+            (size,) = self.SIZE.unpack_from(data, offset)
+            end = offset + self.SIZE.size + size
+            if end > len(data):
+                break
+            try:
+                record = self.decode(data[offset + self.SIZE.size:end])
+            except (ValueError, IndexError, struct.error, UnicodeDecodeError):
+                record = None
+            offset = end
+            if record is not None:
+                yield record
+        if offset != len(data):
+            with open(self.file_path, 'r+b') as file:
+                file.truncate(start + offset)
+
+    def get_size(self) -> int:
+        """
+        Returns the size of the log in bytes, 0 if there is no log yet
+        Returns:
+            size (int)
+        """
+        try:
+            return os.path.getsize(self.file_path)
+        except OSError:
+            return 0
+
+    @staticmethod
+    def make_record(level_id: str, speed: float, accuracy: float,
+                    letter_counter: Counter[str, int], mistakes_counter: Counter[str, int],
+                    latencies: dict[str, LatencyStats], recording: bytes = b'') -> AttemptRecord:
+        """
+        Creates a record of an attempt finished right now
+        Parameters:
+            level_id (str): identifier of the level
+            speed (float): speed in Words Per Minute
+            accuracy (float): share of symbols typed correctly
+            letter_counter (Counter[str, int]): Counter with number of right types of each symbol
+            mistakes_counter (Counter[str, int]): Counter with number of mistakes made for each symbol
+            latencies (dict[str, LatencyStats]): latency of symbols and bigrams
+            recording (bytes): the encoded KeystrokeRecording of the attempt, empty by default
+        Returns:
+            record (AttemptRecord)
+        """
+        return AttemptRecord(level_id, time.time(), speed, accuracy, letter_counter, mistakes_counter, latencies,
+                             recording)
@@ -1,157 +1,189 @@
 from PySide6 import QtWidgets as qtw, QtCore as qtc, QtGui as qtg
 from __feature__ import snake_case, true_property
 
-import math
-
-from constraints import colors, fonts, statistics, texts
-from statistics_calculator import StatisticsCalculator
+from constraints import colors, fonts, limits, statistics, texts
+from profile_manager import ProfileManager
 from base_page import BasePage
 from base_header import BaseHeader
 
 
-class KeyDisplay(qtw.QLabel):
+class Keyboard(qtw.QWidget):
     """
-    KeyDisplay is an interface object showing the accuracy of types of a key via color, inherits QLabel
+    Keyboard is an interface object showing the accuracy of types of each key via color, inherits QWidget
+    All the keys are drawn in a single paint event, the colors, texts and tool tips of both shift states
+    are calculated once when the keyboard is created
 
     Parameters:
-        symbols (str): two symbols key represents: without shift pressed and with shift pressed,
-                       in case they are the same, only one symbol
-        par (qtw.QFrame): parent widget
-        width (int): the width of a key, same as height by default
+        par (qtw.QFrame): parent widget, the keys are placed by statistics locations relative to it
 
     Attributes:
-        symbols (str): the symbols key represents
-        cur_option (int): 0 if shift it shows key without shift pressed, 1 otherwise
+        rects (list[QRect]): the rectangle of each key
+        layers (tuple[list[tuple[str, QColor, str]], list[tuple[str, QColor, str]]]):
+            text, color and tool tip of each key without shift pressed and with shift pressed
+        cur_option (int): 0 if it shows keys without shift pressed, 1 otherwise
     """
-    def __init__(self, symbols: str, par: qtw.QFrame, width: int = statistics.KEY_SIZE):
+    def __init__(self, par: qtw.QFrame):
         super().__init__(parent=par)
-        self.symbols = symbols
-        self.cur_option = 0
-        self.line_width = 3
-        self.auto_fill_background = True
-        self.set_frame_style(qtw.QFrame.Panel | qtw.QFrame.Raised)
-        self.set_fixed_size(qtc.QSize(width, statistics.KEY_SIZE))
-        self.set_style_sheet(f'color: {colors.WHITE_COLOR}')
+        self.set_fixed_size(par.size)
         self.font = fonts.KEY_FONT
-        self.alignment = qtc.Qt.AlignmentFlag.AlignCenter
-        self.update_view()
-
-    def get_accuracy(self) -> float:
-        """
-        Returns the accuracy of current symbol of the key
+        self.cur_option = 0
+        keys = [(symbols, x_shift, y_shift, statistics.KEY_SIZE)
+                for symbols, x_shift, y_shift in statistics.KEY_LOCATIONS]
+        keys.append(('\n', *statistics.ENTER_LOCATION, statistics.LONG_KEY_SIZE))
+        keys.append(('\t', *statistics.TAB_LOCATION, statistics.LONG_KEY_SIZE))
+        keys.append((' ', *statistics.SPACE_LOCATION, statistics.SPACE_SIZE))
+        self.rects = [qtc.QRect(x_shift, y_shift, width, statistics.KEY_SIZE) for _, x_shift, y_shift, width in keys]
+        self.layers = self.make_layers([symbols for symbols, _, _, _ in keys])
+
+    @classmethod
+    def make_layers(cls, keys: list[str]) -> tuple[list[tuple], list[tuple]]:
+        """
+        Calculates the accuracy and the color of all the symbols shown on the keys at once
+        Parameters:
+            keys (list[str]): the symbols of each key, without shift and with shift, or a single symbol
         Returns:
-            accuracy (float)
+            layers (tuple[list[tuple[str, QColor, str]], list[tuple[str, QColor, str]]]):
+                text, color and tool tip of each key for both shift states
         """
-        return StatisticsCalculator().get_accuracy(self.get_symbol())
+        symbols = ''.join(symbols[0] for symbols in keys) + ''.join(symbols[-1] for symbols in keys)
+        accuracy, rgb = ProfileManager().get_calculator().get_heatmap(symbols)
+        views = [(cls.get_text(symbol), qtg.QColor(*map(int, rgb[i])), cls.get_tool_tip(float(accuracy[i])))
+                 for i, symbol in enumerate(symbols)]
+        return views[:len(keys)], views[len(keys):]
 
-    def setup_tool_tip(self) -> None:
-        """
-        Sets up the tool tip for the key
-        """
-        accuracy = self.get_accuracy()
-        if accuracy == -1:
-            self.tool_tip = f'<font color=black>{texts.NO_DATA_TEXT}</font>'
-        else:
-            self.tool_tip = f'<Font color=black>{texts.ACCURACY_TEXT}: {accuracy * 100:.0f}%</font>'
-
-    def get_color(self) -> qtg.QColor:
-        """
-        Returns the color of the key calculated by its current symbol accuracy
-        Returns:
-            color (QColor)
-        """
-        accuracy = self.get_accuracy()
-        if accuracy == -1:
-            return colors.DARK_GRAY_COLOR
-        if accuracy >= statistics.GREEN_MIN_ACCURACY:
-            return qtg.QColor(colors.GREEN_COLOR)
-        if accuracy <= statistics.RED_MAX_ACCURACY:
-            return qtg.QColor(colors.RED_COLOR)
-        fraction = ((accuracy - statistics.RED_MAX_ACCURACY) /
-                    (statistics.GREEN_MIN_ACCURACY - statistics.RED_MAX_ACCURACY))
-        return qtg.QColor(math.ceil(fraction * colors.GREEN_COLOR_RGB[0] + (1 - fraction) * colors.RED_COLOR_RGB[0]),
-                          math.ceil(fraction * colors.GREEN_COLOR_RGB[1] + (1 - fraction) * colors.RED_COLOR_RGB[1]),
-                          math.ceil(fraction * colors.GREEN_COLOR_RGB[2] + (1 - fraction) * colors.RED_COLOR_RGB[2]))
-
-    def get_text(self) -> str:
+    @staticmethod
+    def get_text(symbol: str) -> str:
         """
         Returns the text that should be shown on the key
         It is different from the symbol for Space, Tab and Enter keys
+        Parameters:
+            symbol (str): the symbol of the key
         Returns:
             text (str)
         """
-        if len(self.symbols) == 2:
-            return self.symbols[self.cur_option]
-        if self.symbols == '\t':
+        if symbol == '\t':
             return "Tab"
-        if self.symbols == '\n':
+        if symbol == '\n':
             return "Enter"
-        return "Space"
+        if symbol == ' ':
+            return "Space"
+        return symbol
 
-    def get_symbol(self) -> str:
+    @staticmethod
+    def get_tool_tip(accuracy: float) -> str:
         """
-        Returns the current symbol depending on cur_option
+        Returns the tool tip of the key
+        Parameters:
+            accuracy (float): accuracy of the symbol, -1 if it was never typed
         Returns:
-            symbol (str)
+            tool_tip (str)
         """
-        if len(self.symbols) == 1:
-            return self.symbols
-        return self.symbols[self.cur_option]
+        if accuracy == -1:
+            return f'<font color=black>{texts.NO_DATA_TEXT}</font>'
+        return f'<Font color=black>{texts.ACCURACY_TEXT}: {accuracy * 100:.0f}%</font>'
 
     def switch_shift(self) -> None:
         """
-        Switches the key state when shift state changes
+        Switches the keys when shift state changes
         """
         self.cur_option = 1 - self.cur_option
-        self.update_view()
+        self.update()
 
-    def set_color(self) -> None:
+    def key_at(self, point: qtc.QPoint) -> int | None:
         """
-        Sets up the color of the key
+        Returns the index of the key under the point
+        Parameters:
+            point (QPoint): point in the coordinates of the keyboard
+        Returns:
+            index (int | None): None in case there is no key under the point
         """
-        palette = self.palette
-        palette.set_color(self.background_role(), qtg.QColor(self.get_color()))
-        self.palette = palette
+        for i, rect in enumerate(self.rects):
+            if rect.contains(point):
+                return i
+        return None
 
-    def update_view(self) -> None:
+    def paint_event(self, event) -> None:
         """
-        Updates the look of the key: text, color and tool tip
+        Overloaded virtual function, draws all the keys
         """
-        self.text = self.get_text()
-        self.set_color()
-        self.setup_tool_tip()
+        painter = qtg.QPainter(self)
+        painter.set_pen(qtg.QColor(colors.WHITE_COLOR))
+        for rect, (text, color, _) in zip(self.rects, self.layers[self.cur_option]):
+            painter.fill_rect(rect, color)
+            qtw.qDrawShadePanel(painter, rect, self.palette, False, 3)
+            painter.draw_text(rect, qtc.Qt.AlignmentFlag.AlignCenter, text)
+        painter.end()
+
+    def event(self, event: qtc.QEvent) -> bool:
+        """
+        Overloaded virtual function, shows the tool tip of the key under the mouse
+        """
+        if event.type() != qtc.QEvent.ToolTip:
+            return super().event(event)
+        index = self.key_at(event.pos())
+        if index is None:
+            qtw.QToolTip.hide_text()
+            event.ignore()
+        else:
+            qtw.QToolTip.show_text(event.global_pos(), self.layers[self.cur_option][index][2], self)
+        return True
 
 
 class StatisticsPage(BasePage):
     """
     StatisticPage is a page where the accuracy statistics for each key is shown
     Does not take any parameters
+
+    Attributes:
+        keyboard (Keyboard): the keys colored by accuracy
+        summary (QLabel): the summary of the attempts
+        store_timer (QTimer): the timer showing the summary again while the attempts are imported to the database
     """
     def __init__(self):
         super().__init__()
         layout = qtw.QVBoxLayout()
         layout.add_widget(BaseHeader(texts.STATISTICS_HEADER))
         layout.add_stretch()
+        self.summary = qtw.QLabel()
+        self.summary.font = fonts.TYPER_STATISTICS_FONT
+        self.summary.alignment = qtc.Qt.AlignmentFlag.AlignCenter
+        layout.add_widget(self.summary)
         self.set_layout(layout)
-        self.keys = []
-        for symbols, x_shift, y_shift in statistics.KEY_LOCATIONS:
-            cur_key = KeyDisplay(symbols, self)
-            cur_key.move(x_shift, y_shift)
-            self.keys.append(cur_key)
-        enter_key = KeyDisplay('\n', self, statistics.LONG_KEY_SIZE)
-        enter_key.move(*statistics.ENTER_LOCATION)
-        tab_key = KeyDisplay('\t', self, statistics.LONG_KEY_SIZE)
-        tab_key.move(*statistics.TAB_LOCATION)
-        space_key = KeyDisplay(' ', self, statistics.SPACE_SIZE)
-        space_key.move(*statistics.SPACE_LOCATION)
+        self.keyboard = Keyboard(self)
         self.make_shift_button()
-
-    def switch_shift(self) -> None:
-        """
-        Switches the state of all the keys when shift state is changed
-        """
-        for key in self.keys:
-            key.switch_shift()
+        self.store_timer = qtc.QTimer(self)
+        self.store_timer.interval = limits.STORE_POLL_INTERVAL
+        self.store_timer.timeout.connect(self.show_summary)
+        self.show_summary()
+
+    def show_summary(self) -> None:
+        """
+        Shows the number of attempts, the best speed and the speed and accuracy of the last attempts.
+        The summary is empty in case there is no attempts database. While the attempts are imported to it,
+        shows no data and checks again every limits.STORE_POLL_INTERVAL milliseconds
+        """
+        calculator = ProfileManager().get_calculator()
+        if calculator.store is None:
+            self.store_timer.stop()
+            return
+        store = calculator.get_store()
+        if store is None:
+            self.summary.text = texts.NO_DATA_TEXT
+            if not self.store_timer.active:
+                self.store_timer.start()
+            return
+        self.store_timer.stop()
+        summary = store.get_summary()
+        if summary.attempts == 0:
+            self.summary.text = texts.NO_DATA_TEXT
+            return
+        recent = texts.RECENT_TEXT.format(limits.RECENT_ATTEMPTS)
+        accuracy = f'{summary.recent_accuracy * 100:.0f}{texts.ACCURACY_RESOLUTION}' \
+            if summary.recent_accuracy != -1 else texts.NO_DATA_TEXT
+        self.summary.text = (f'{texts.ATTEMPTS_TEXT}: {summary.attempts}   '
+                             f'{texts.BEST_SPEED_TEXT}: {summary.best_speed:.2f} {texts.SPEED_RESOLUTION}   '
+                             f'{recent} {texts.SPEED_TEXT}: {summary.recent_speed:.2f} {texts.SPEED_RESOLUTION}   '
+                             f'{recent} {texts.ACCURACY_TEXT}: {accuracy}')
 
     def make_shift_button(self) -> None:
         """
@@ -161,4 +193,4 @@ class StatisticsPage(BasePage):
         shift_button.font = fonts.KEY_FONT
         shift_button.move(*statistics.SHIFT_BUTTON_LOCATION)
         shift_button.set_fixed_size(qtc.QSize(statistics.LONG_KEY_SIZE, statistics.KEY_SIZE))
-        shift_button.pressed.connect(self.switch_shift)
+        shift_button.pressed.connect(self.keyboard.switch_shift)
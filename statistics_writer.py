@@ -0,0 +1,127 @@
+import os
+import queue
+import threading
+from collections.abc import Callable
+
+from constraints import limits
+from statistics_log import StatisticsLog, AttemptRecord
+from attempt_store import AttemptStore
+
+
+class StatisticsWriter:
+    """
+    StatisticsWriter saves the attempts on a background thread, so the UI thread never waits for the disk
+    The attempts submitted while a write is in progress are coalesced and appended to the log with a single write.
+    Every limits.SNAPSHOT_INTERVAL records and on close the snapshot of the totals is written to a temporary file
+    which then replaces the old snapshot, so a crash never leaves a half-written snapshot
+    Before the first write the thread imports the attempts the store does not have yet, which takes long for
+    a big history, the store is not queried until store_ready is set
+
+    Parameters:
+        log (StatisticsLog): the log to append the attempts to
+        snapshot_path (str): path to the snapshot file
+        make_snapshot (Callable[[int, int], bytes | None]): returns the snapshot of the totals for the number of
+                                                             records written and the size of the log,
+                                                             None if the totals already include unwritten records
+        store (AttemptStore | None): the store to import the written records to, None if there is no store
+        legacy_path (str | None): path to the totals stored with pickle by the older versions to import to the store,
+                                  None if there are none
+
+    Attributes:
+        log (StatisticsLog)
+        snapshot_path (str)
+        make_snapshot (Callable[[int, int], bytes | None])
+        store (AttemptStore | None)
+        legacy_path (str | None)
+        store_ready (Event): set when the store has all the attempts of the log imported on start
+        queue (Queue[AttemptRecord | None]): submitted records, None asks the thread to stop
+        pending (list[AttemptRecord]): records failed to be written, they are retried with the next ones
+        written (int): number of records written
+        unsnapshotted (int): number of records written after the last snapshot
+        thread (Thread): the writer thread
+    """
+    def __init__(self, log: StatisticsLog, snapshot_path: str, make_snapshot: Callable[[int, int], bytes | None],
+                 store: AttemptStore | None = None, legacy_path: str | None = None):
+        self.log = log
+        self.snapshot_path = snapshot_path
+        self.make_snapshot = make_snapshot
+        self.store = store
+        self.legacy_path = legacy_path
+        self.store_ready = threading.Event()
+        self.queue = queue.Queue()
+        self.pending = []
+        self.written = 0
+        self.unsnapshotted = 0
+        self.thread = threading.Thread(target=self.run, name='statistics-writer', daemon=True)
+        self.thread.start()
+
+    def submit(self, record: AttemptRecord) -> None:
+        """
+        Queues the record to be written, does not block
+        Parameters:
+            record (AttemptRecord): attempt to save
+        """
+        self.queue.put(record)
+
+    def close(self) -> None:
+        """
+        Writes all the queued records and the snapshot, stops the thread
+        """
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+
+    def run(self) -> None:
+        """
+        The loop of the thread: imports the attempts to the store, then takes all the queued records at once
+        and writes them
+        """
+        if self.store is not None:
+            if self.legacy_path is not None:
+                self.store.import_pickle(self.legacy_path)
+            self.store.import_log(self.log)
+            self.store_ready.set()
+        stop = False
+        while not stop:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            self.pending.extend(record for record in batch if record is not None)
+            self.write(force_snapshot=stop)
+        if self.store is not None:
+            self.store.close()
+
+    def write(self, force_snapshot: bool) -> None:
+        """
+        Appends the pending records to the log and writes the snapshot when it is time to
+        Parameters:
+            force_snapshot (bool): whether to write the snapshot if there is anything new
+        """
+        try:
+            size = self.log.append(self.pending) if self.pending else self.log.get_size()
+        except OSError:
+            return
+        self.written += len(self.pending)
+        self.unsnapshotted += len(self.pending)
+        if self.pending and self.store is not None:
+            self.store.import_log(self.log)
+        self.pending = []
+        if self.unsnapshotted == 0 or (self.unsnapshotted < limits.SNAPSHOT_INTERVAL and not force_snapshot):
+            return
+        data = self.make_snapshot(self.written, size)
+        if data is None:
+            return
+        temporary_path = self.snapshot_path + '.tmp'
+        try:
+            with open(temporary_path, 'wb') as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary_path, self.snapshot_path)
+        except OSError:
+            return
+        self.unsnapshotted = 0
@@ -0,0 +1,109 @@
+from collections import Counter, OrderedDict
+from collections.abc import Iterator
+
+from constraints import limits
+
+
+class StreamedText:
+    """
+    StreamedText is a read-only text of a file which is read from disk by chunks only when needed
+    It supports len, indexing, slicing, iteration and search of a symbol like str, only a few chunks are kept in memory
+    The file is scanned once when the object is created to count the symbols
+
+    Parameters:
+        file_path (str): path to the file
+        skip_lines (int): number of the first lines of the file which are not a part of the text
+
+    Attributes:
+        file_path (str)
+        length (int): number of symbols in the text
+        histogram (Counter[str, int]): number of occurrences of each symbol
+        chunk_positions (list[int]): file position of the start of each chunk
+        chunks (OrderedDict[int, str]): the last used chunks by their numbers
+    """
+    CHUNK_SIZE = limits.STREAMED_TEXT_CHUNK_SIZE
+    CACHED_CHUNKS = 4
+
+    def __init__(self, file_path: str, skip_lines: int = 0):
+        self.file_path = file_path
+        self.length = 0
+        self.histogram = Counter()
+        self.chunk_positions = []
+        self.chunks = OrderedDict()
+        with open(file_path, 'r') as file:
+            for _ in range(skip_lines):
+                file.readline()
+            while True:
+                position = file.tell()
+                chunk = file.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                self.chunk_positions.append(position)
+                self.length += len(chunk)
+                self.histogram.update(chunk)
+
+    def get_chunk(self, number: int) -> str:
+        """
+        Returns the chunk of the text, reads it from the file if it is not cached
+        Parameters:
+            number (int): the number of the chunk
+        Returns:
+            chunk (str)
+        """
+        chunk = self.chunks.get(number)
+        if chunk is not None:
+            self.chunks.move_to_end(number)
+            return chunk
+        with open(self.file_path, 'r') as file:
+            file.seek(self.chunk_positions[number])
+            chunk = file.read(self.CHUNK_SIZE)
+        self.chunks[number] = chunk
+        if len(self.chunks) > self.CACHED_CHUNKS:
+            self.chunks.popitem(last=False)
+        return chunk
+
+    def find(self, symbol: str, start: int = 0, end: int | None = None) -> int:
+        """
+        Returns the lowest index of the symbol in text[start:end] like str.find, reads only the chunks searched
+        Parameters:
+            symbol (str): a single symbol
+            start (int): the beginning of the searched part
+            end (int | None): the end of the searched part, the end of the text by default
+        Returns:
+            index (int): -1 in case the symbol is not found
+        """
+        start, end, _ = slice(start, end).indices(self.length)
+        while start < end:
+            number, offset = divmod(start, self.CHUNK_SIZE)
+            chunk = self.get_chunk(number)
+            index = chunk.find(symbol, offset, offset + end - start)
+            if index != -1:
+                return number * self.CHUNK_SIZE + index
+            start += len(chunk) - offset
+        return -1
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, key: int | slice) -> str:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.length)
+            if step != 1:
+                raise ValueError('StreamedText supports only continuous slices')
+            parts = []
+            while start < stop:
+                number, offset = divmod(start, self.CHUNK_SIZE)
+                part = self.get_chunk(number)[offset:offset + stop - start]
+                parts.append(part)
+                start += len(part)
+            return ''.join(parts)
+        if key < 0:
+            key += self.length
+        if not 0 <= key < self.length:
+            raise IndexError('StreamedText index out of range')
+        number, offset = divmod(key, self.CHUNK_SIZE)
+        return self.get_chunk(number)[offset]
+
+    def __iter__(self) -> Iterator[str]:
+        for number in range(len(self.chunk_positions)):
+            yield from self.get_chunk(number)
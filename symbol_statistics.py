@@ -0,0 +1,152 @@
+import numpy as np
+from collections import Counter
+
+from constraints import colors, statistics
+
+
+class SymbolStatistics:
+    """
+    SymbolStatistics keeps the numbers of correct types and mistakes of each symbol in NumPy arrays
+    Every symbol of statistics.SYMBOLS has a fixed index, all the other symbols share the last index
+    Every added attempt is also kept as a row of the history matrices for trend queries, unless told otherwise.
+    The history is not a part of the state, so saving the totals does not depend on the number of attempts
+    Does not take any parameters
+
+    Attributes:
+        hits (np.ndarray): number of correct types of each symbol
+        misses (np.ndarray): number of mistakes of each symbol
+        hits_history (np.ndarray): attempt x symbol matrix of correct types, only the first attempts_count rows are used
+        misses_history (np.ndarray): attempt x symbol matrix of mistakes
+        attempts_count (int): number of attempts in the history
+    """
+    INDEX = {symbol: i for i, symbol in enumerate(statistics.SYMBOLS)}
+    SIZE = len(statistics.SYMBOLS) + 1
+
+    def __init__(self):
+        self.hits = np.zeros(self.SIZE, np.int64)
+        self.misses = np.zeros(self.SIZE, np.int64)
+        self.hits_history = np.zeros((16, self.SIZE), np.int64)
+        self.misses_history = np.zeros((16, self.SIZE), np.int64)
+        self.attempts_count = 0
+
+    @classmethod
+    def get_indices(cls, symbols: str) -> np.ndarray:
+        """
+        Returns the indices of the symbols
+        Parameters:
+            symbols (str): symbols, one index for each
+        Returns:
+            indices (np.ndarray)
+        """
+        return np.fromiter((cls.INDEX.get(symbol, cls.SIZE - 1) for symbol in symbols), np.intp, len(symbols))
+
+    @classmethod
+    def to_vector(cls, counter: Counter[str, int]) -> np.ndarray:
+        """
+        Converts the Counter of symbols to a vector of counts by index
+        Parameters:
+            counter (Counter[str, int]): Counter to convert
+        Returns:
+            vector (np.ndarray)
+        """
+        vector = np.zeros(cls.SIZE, np.int64)
+        np.add.at(vector, cls.get_indices(''.join(counter.keys())),
+                  np.fromiter(counter.values(), np.int64, len(counter)))
+        return vector
+
+    def add(self, letter_counter: Counter[str, int], mistakes_counter: Counter[str, int],
+            keep_history: bool = True) -> None:
+        """
+        Adds up the attempt
+        Parameters:
+            letter_counter (Counter[str, int]): Counter with number of right types of each symbol
+            mistakes_counter (Counter[str, int]): Counter with number of mistakes made for each symbol
+            keep_history (bool): whether to add the attempt to the history, True by default
+        """
+        hits = self.to_vector(letter_counter)
+        misses = self.to_vector(mistakes_counter)
+        self.hits += hits
+        self.misses += misses
+        if not keep_history:
+            return
+        if self.attempts_count == len(self.hits_history):
+            self.hits_history = np.concatenate((self.hits_history, np.zeros_like(self.hits_history)))
+            self.misses_history = np.concatenate((self.misses_history, np.zeros_like(self.misses_history)))
+        self.hits_history[self.attempts_count] = hits
+        self.misses_history[self.attempts_count] = misses
+        self.attempts_count += 1
+
+    def get_state(self) -> dict[str, np.ndarray]:
+        """
+        Returns the copies of the totals, enough to restore them with set_state
+        Returns:
+            state (dict[str, np.ndarray])
+        """
+        return {'hits': self.hits.copy(), 'misses': self.misses.copy()}
+
+    def set_state(self, state: dict[str, np.ndarray]) -> None:
+        """
+        Restores the totals from the arrays returned by get_state, the history is cleared
+        Parameters:
+            state (dict[str, np.ndarray]): the arrays
+        """
+        hits = state['hits'].astype(np.int64)
+        misses = state['misses'].astype(np.int64)
+        if hits.shape != (self.SIZE,) or misses.shape != (self.SIZE,):
+            raise ValueError('The statistics state does not match the symbols')
+        self.hits = hits
+        self.misses = misses
+        self.hits_history = np.zeros((16, self.SIZE), np.int64)
+        self.misses_history = np.zeros((16, self.SIZE), np.int64)
+        self.attempts_count = 0
+
+    @staticmethod
+    def calculate_accuracy(hits: np.ndarray, misses: np.ndarray) -> np.ndarray:
+        """
+        Returns the accuracy for arrays of correct types and mistakes, -1 where there were no correct types
+        Parameters:
+            hits (np.ndarray), misses (np.ndarray): arrays of the same shape
+        Returns:
+            accuracy (np.ndarray)
+        """
+        total = hits + misses
+        return np.divide(hits, total, out=np.full(hits.shape, -1.0), where=hits > 0)
+
+    def get_accuracy(self, symbols: str) -> np.ndarray:
+        """
+        Returns the accuracy of each symbol, -1 for symbols that were never typed
+        Parameters:
+            symbols (str): symbols to calculate accuracy of
+        Returns:
+            accuracy (np.ndarray)
+        """
+        indices = self.get_indices(symbols)
+        return self.calculate_accuracy(self.hits[indices], self.misses[indices])
+
+    def get_accuracy_history(self, symbols: str) -> np.ndarray:
+        """
+        Returns the accuracy of each symbol in each attempt, -1 where the symbol was not typed
+        Parameters:
+            symbols (str): symbols to calculate accuracy of
+        Returns:
+            accuracy (np.ndarray): attempt x symbol matrix
+        """
+        indices = self.get_indices(symbols)
+        return self.calculate_accuracy(self.hits_history[:self.attempts_count, indices],
+                                       self.misses_history[:self.attempts_count, indices])
+
+    @staticmethod
+    def get_colors(accuracy: np.ndarray) -> np.ndarray:
+        """
+        Returns the heatmap colors for the accuracy: from red for statistics.RED_MAX_ACCURACY and less
+        to green for statistics.GREEN_MIN_ACCURACY and more, dark gray where there is no data
+        Parameters:
+            accuracy (np.ndarray): accuracy of symbols, -1 for symbols without data
+        Returns:
+            colors (np.ndarray): n x 3 matrix of RGB components
+        """
+        fraction = np.clip((accuracy - statistics.RED_MAX_ACCURACY) /
+                           (statistics.GREEN_MIN_ACCURACY - statistics.RED_MAX_ACCURACY), 0, 1)[:, np.newaxis]
+        rgb = np.ceil(fraction * np.array(colors.GREEN_COLOR_RGB) + (1 - fraction) * np.array(colors.RED_COLOR_RGB))
+        rgb[accuracy == -1] = colors.DARK_GRAY_COLOR_RGB
+        return rgb.astype(np.int64)
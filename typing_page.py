@@ -1,14 +1,20 @@
-from PySide6 import QtWidgets as qtw, QtCore as qtc
+from PySide6 import QtWidgets as qtw, QtCore as qtc, QtGui as qtg
 from __feature__ import snake_case, true_property
 
-import html
 import time
-import math
+from array import array
 from collections import Counter
+from functools import partial
+from itertools import accumulate
 
 from main_window_actions import MainWindowActions
-from constraints import colors, fonts, sizes, texts
-from statistics_calculator import StatisticsCalculator
+from constraints import colors, fonts, sizes, texts, limits
+from typing_session import TypingSession
+from profile_manager import ProfileManager
+from level_catalog import Level, LevelCatalog
+from level_recommender import LevelRecommender
+from keystroke_recording import KeystrokeRecording, GhostTimeline
+from streamed_text import StreamedText
 from base_page import BasePage
 from base_button import BaseButton
 from base_header import BaseHeader
@@ -17,126 +23,256 @@ from base_header import BaseHeader
 class Typer(qtw.QTextEdit):
     """
     Typer is a widget where the user types the text and sees the text to type, inherits QTextEdit
-    Also it collects the information about types, namely speed and accuracy
+    The information about types, namely speed and accuracy, is collected by its TypingSession
+    Only a window of limits.WINDOW_LENGTH symbols around the cursor is in the document,
+    it is moved forward when the cursor comes close to its end
+    All the symbols of an input event are checked at once, key repeats are compressed into one event by Qt.
+    The document is updated once per turn of the event loop, however many events came during the turn.
+    The keystrokes are recorded to be saved with the statistics, a recorded attempt can be raced as a ghost:
+    the symbol the ghost is about to type is highlighted, its position is updated limits.GHOST_RATE times per second
 
     Parameters:
-        text (str): text to type
+        text (str | StreamedText): text to type
+        level_id (str): identifier of the level, used to save the statistics
         goal_speed (float): speed user should have to get maximal score
         goal_accuracy (float): accuracy user should have to get maximal score
-        status_bar (QStatusBar): status bar to write current speed
 
     Attributes:
-        typing_text (str): the text to type
-        goal_speed (float)
-        goal_accuracy (float)
-        progress (int): the number of symbols typed correctly
-        start_time_stamp (float): the moment of the start of typing
-        mistakes_counter (Counter[str, int]): Counter counting mistakes
+        session (TypingSession): the state of typing
+        level_id (str)
+        window_start (int), window_end (int): the part of the text in the document, includes start, excludes end
+        display_offsets (array[int]): display_offsets[i] is the position in the document after the first i symbols
+                                      of the window
+        typed_format (QTextCharFormat): format applied to the symbols typed correctly
+        untyped_format (QTextCharFormat): format of the symbols not typed yet
+        rendered_progress (int): the progress shown in the document
+        render_timer (QTimer): zero-interval single-shot timer updating the document after the queued events
+        recording (KeystrokeRecording): the keystrokes of the attempt
+        ghost (GhostTimeline | None): the attempt raced, None without ghost
+        ghost_progress (int): the progress of the ghost shown
+        ghost_format (QTextCharFormat): format of the symbol the ghost is about to type
+        ghost_timer (QTimer): the timer moving the ghost
+        finished (bool): whether the level is finished and its statistics are saved
     """
-    def __init__(self, text: str, goal_speed: float, goal_accuracy: float, status_bar: qtw.QStatusBar):
+    def __init__(self, text: str | StreamedText, level_id: str, goal_speed: float, goal_accuracy: float):
         super().__init__()
-        self.typing_text = text
-        self.goal_speed = goal_speed
-        self.goal_accuracy = goal_accuracy
-        self.progress = 0
-        self.update_text()
-        self.start_time_stamp = None
-        self.status_bar = status_bar
-        self.mistakes_counter = Counter()
+        self.session = TypingSession(text, goal_speed, goal_accuracy)
+        self.level_id = level_id
+        self.window_start = 0
+        self.window_end = 0
+        self.display_offsets = None
+        self.undo_redo_enabled = False
+        self.typed_format = qtg.QTextCharFormat()
+        self.typed_format.set_foreground(qtg.QBrush(qtg.QColor(colors.GREEN_COLOR)))
+        self.untyped_format = qtg.QTextCharFormat()
+        self.untyped_format.set_foreground(qtg.QBrush(qtg.QColor(colors.GRAY_COLOR)))
+        self.set_attribute(qtc.Qt.WA_KeyCompression)
+        self.set_attribute(qtc.Qt.WA_InputMethodEnabled)
+        self.rendered_progress = 0
+        self.render_timer = qtc.QTimer(self)
+        self.render_timer.set_property('singleShot', True)  # single_shot is the static function with true_property
+        self.render_timer.interval = 0
+        self.render_timer.timeout.connect(self.render_progress)
+        self.recording = KeystrokeRecording(KeystrokeRecording.get_content_hash(text))
+        self.ghost = None
+        self.ghost_progress = 0
+        self.ghost_format = qtg.QTextCharFormat()
+        self.ghost_format.set_background(qtg.QBrush(qtg.QColor(colors.GHOST_COLOR)))
+        self.ghost_timer = qtc.QTimer(self)
+        self.ghost_timer.interval = 1000 // limits.GHOST_RATE
+        self.ghost_timer.timeout.connect(self.move_ghost)
+        self.finished = False
+        self.move_window()
 
     @staticmethod
-    def format_text_to_html(text: str, color: str) -> str:
+    def format_text(text: str) -> str:
         """
-        Formats text to html so that all symbols are displayed right and colored in color
+        Formats text so that all symbols are displayed right, every line of the text becomes a separate block
+        of the document, so recoloring a symbol only lays out its line again
         Parameters:
             text (str): text to format
-            color (str): color of text #RRGGBB
         Returns:
             line (str): formatted text
         """
-        return f'<t style="color: {color};white-space:pre-wrap">' + \
-            html.escape(text).replace('\n', '↵<br />').replace('\t', ' ⇥ ') + '</t>'
+        return text.replace('\n', texts.NEWLINE_GLYPH + '\n').replace('\t', texts.TAB_GLYPH)
+
+    @staticmethod
+    def make_display_offsets(text: str) -> array:
+        """
+        Builds the prefix sums of the displayed lengths of the symbols, see format_text
+        Parameters:
+            text (str): text to type
+        Returns:
+            display_offsets (array[int]): array of len(text) + 1 document positions
+        """
+        widths = {'\n': len(texts.NEWLINE_GLYPH) + 1, '\t': len(texts.TAB_GLYPH)}  # newline also takes a line break
+        return array('q', accumulate((widths.get(symbol, 1) for symbol in text), initial=0))
+
+    def get_display_position(self, progress: int) -> int:
+        """
+        Returns the position in the displayed document right after the first progress symbols of the text
+        Parameters:
+            progress (int): number of symbols of the text, should be inside the window
+        Returns:
+            position (int)
+        """
+        return self.display_offsets[progress - self.window_start]
 
     def move_cursor_to_place(self) -> None:
         """
         Moves the cursor after the symbols typed correctly
         """
         cur_cursor = self.text_cursor()
-        cur_cursor.set_position(self.progress + self.typing_text[:self.progress].count('\n') +
-                                self.typing_text[:self.progress].count('\t') * 2)
+        cur_cursor.set_position(self.get_display_position(self.session.progress))
         self.set_text_cursor(cur_cursor)
 
-    def update_text(self) -> None:
+    def move_window(self) -> None:
         """
-        Updates the displayed text so the color of typed is green and the color of the rest is gray, moves the cursor
+        Moves the window so that it starts at the first beginning of a line at most limits.WINDOW_MARGIN symbols
+        before the cursor, renders the window
+        """
+        text, progress = self.session.text, self.session.progress
+        start = max(0, progress - limits.WINDOW_MARGIN)
+        if start > 0:
+            line_end = text.find('\n', start - 1, progress)
+            if line_end != -1:
+                start = line_end + 1
+        self.window_start = start
+        self.window_end = min(len(text), start + limits.WINDOW_LENGTH)
+        self.display_offsets = self.make_display_offsets(text[self.window_start:self.window_end])
+        self.render_text()
+        self.rendered_progress = progress
+        self.render_ghost()
+
+    def render_text(self) -> None:
+        """
+        Builds the displayed document of the window: the typed part is green and the rest is gray, moves the cursor
         """
         self.font = fonts.TYPER_FONT
-        self.html = (self.format_text_to_html(self.typing_text[:self.progress], colors.GREEN_COLOR) +
-                     self.format_text_to_html(self.typing_text[self.progress:], colors.GRAY_COLOR))
+        text, progress = self.session.text, self.session.progress
+        self.clear()
+        cursor = qtg.QTextCursor(self.document)
+        cursor.insert_text(self.format_text(text[self.window_start:progress]), self.typed_format)
+        cursor.insert_text(self.format_text(text[progress:self.window_end]), self.untyped_format)
         self.move_cursor_to_place()
 
-    def update_status(self) -> None:
+    def update_text(self, old_progress: int) -> None:
         """
-        Shows status bar message with speed
+        Recolors only the symbols typed since old_progress to green and moves the cursor,
+        the rest of the document is left untouched. In case the cursor is close to the end of the window,
+        moves the window instead
+        Parameters:
+            old_progress (int): the progress shown before the last types
         """
-        self.status_bar.show_message(f'{texts.SPEED_TEXT}: {self.get_speed():.2f} {texts.SPEED_RESOLUTION}', 500)
+        if (self.session.progress > self.window_end - limits.WINDOW_MARGIN and
+                self.window_end < len(self.session.text)):
+            self.move_window()
+            return
+        cursor = qtg.QTextCursor(self.document)
+        cursor.set_position(self.get_display_position(old_progress))
+        cursor.set_position(self.get_display_position(self.session.progress), qtg.QTextCursor.KeepAnchor)
+        cursor.merge_char_format(self.typed_format)
+        self.move_cursor_to_place()
+        self.rendered_progress = self.session.progress
 
-    def key_press_event(self, event) -> None:
+    def set_ghost(self, ghost: GhostTimeline | None) -> None:
         """
-        Overloaded virtual function, calls type with the typed symbol
+        Starts or stops racing the ghost, the ghost starts with the first keystroke
+        Parameters:
+            ghost (GhostTimeline | None): the recorded attempt, None to hide the ghost
         """
-        if self.progress == len(self.typing_text):
-            return
-        symbol = event.text()
-        if self.start_time_stamp is None:
-            self.start_time_stamp = time.time_ns()
-        if event.key() == qtc.Qt.Key_Enter or event.key() == qtc.Qt.Key_Return:  # enter or numpad enter
-            symbol = '\n'
-        if symbol == "":
+        self.ghost = ghost
+        if ghost is None:
+            self.ghost_timer.stop()
+        elif self.session.start_time_stamp is not None and not self.session.is_finished():
+            self.ghost_timer.start()
+        self.render_ghost()
+
+    def move_ghost(self) -> None:
+        """
+        Moves the ghost to its progress at the current moment of the attempt, stops the timer when the ghost
+        or the user has finished
+        """
+        time_ms = (time.perf_counter_ns() - self.session.start_time_stamp) // 1_000_000
+        progress = self.ghost.seek(time_ms)
+        if progress != self.ghost_progress:
+            self.ghost_progress = progress
+            self.render_ghost()
+        if self.ghost.is_finished() or self.session.is_finished():
+            self.ghost_timer.stop()
+
+    def render_ghost(self) -> None:
+        """
+        Highlights the symbol the ghost is about to type, in case it is in the window
+        """
+        progress = self.ghost_progress
+        if self.ghost is None or not self.window_start <= progress < self.window_end:
+            self.set_extra_selections([])
             return
-        self.type(symbol)
+        cursor = qtg.QTextCursor(self.document)
+        cursor.set_position(self.get_display_position(progress))
+        cursor.set_position(self.get_display_position(progress + 1), qtg.QTextCursor.KeepAnchor)
+        selection = qtw.QTextEdit.ExtraSelection()
+        selection.cursor = cursor
+        selection.format = self.ghost_format
+        self.set_extra_selections([selection])
 
-    def type(self, symbol: str) -> None:
+    def render_progress(self) -> None:
         """
-        Does staff when symbol is typed, recolors text if it is correct and counts the mistake otherwise
-        Parameters:
-            symbol (str): symbol typed
-        """
-        need = self.typing_text[self.progress]
-        if need == symbol:
-            self.progress += 1
-            self.update_text()
-            self.update_status()
-            if self.progress == len(self.typing_text):
-                self.finish_level()
-        else:
-            self.mistakes_counter[need] += 1
+        Shows the symbols typed since the last update, finishes the level when the whole text is typed
+        """
+        if self.session.progress != self.rendered_progress:
+            self.update_text(self.rendered_progress)
+        if self.session.is_finished():
+            self.finish_level()
+
+    def key_press_event(self, event) -> None:
+        """
+        Overloaded virtual function, calls type with the typed symbols, a compressed event has several symbols
+        """
+        symbols = event.text()
+        if event.key() == qtc.Qt.Key_Enter or event.key() == qtc.Qt.Key_Return:  # enter or numpad enter
+            symbols = '\n' * max(1, event.count())
+        self.type(symbols.replace('\r', '\n'))
 
-    def get_speed(self) -> float:
+    def input_method_event(self, event) -> None:
         """
-        Return current speed in Words Per Minute
-        Returns:
-            speed (float)
+        Overloaded virtual function, calls type with the symbols committed by the input method,
+        they are not inserted to the document
         """
-        cur_time = (time.time_ns() - self.start_time_stamp) / 10 ** 9 / 60  # in minutes
-        cur_word_count = self.progress / 5  # in words
-        return cur_word_count / cur_time
+        self.type(event.commit_string())
+        event.accept()
 
-    def get_accuracy(self) -> float:
+    def type(self, symbols: str) -> None:
         """
-        Return current accuracy, the share of symbols typed correctly
-        Returns:
-            accuracy (float)
+        Passes the typed symbols to the session, schedules the update of the document if any of them is correct
+        Parameters:
+            symbols (str): symbols typed
         """
-        all_cnt = self.progress + self.mistakes_counter.total()
-        return self.progress / all_cnt
+        if symbols == '' or self.session.is_finished():
+            return
+        time_stamp = time.perf_counter_ns()
+        self.recording.record(symbols, time_stamp)
+        if self.session.type_text(symbols, time_stamp) and not self.render_timer.active:
+            self.render_timer.start()
+        if self.ghost is not None and not self.ghost_timer.active and not self.ghost.is_finished():
+            self.ghost_timer.start()
 
     def finish_level(self) -> None:
         """
-        Finishes level, updates the statistics and shows the level end widget
+        Finishes level, updates the statistics and shows the level end widget, only once
         """
-        StatisticsCalculator().add_stats(self.mistakes_counter, Counter(self.typing_text))
-        self.set_layout(FinishLayout(self.get_speed(), self.goal_speed, self.get_accuracy(), self.goal_accuracy))
+        if self.finished:
+            return
+        self.finished = True
+        session = self.session
+        speed = session.get_speed()
+        accuracy = session.get_accuracy()
+        self.ghost_timer.stop()
+        ProfileManager().get_calculator().add_stats(session.mistakes_counter, Counter(session.text), self.level_id,
+                                                    speed, accuracy, session.get_latencies(), self.recording.encode())
+        MainWindowActions().statistics_changed_function()
+        self.set_layout(FinishLayout(speed, session.goal_speed, accuracy, session.goal_accuracy, self.level_id))
 
     # overloaded functions for user not to be able to do anything on Typer with mouse
     def mouse_press_event(self, event):
@@ -154,31 +290,16 @@ class FinishLayout(qtw.QVBoxLayout):
         goal_speed (float): level goal speed
         accuracy (float): user's accuracy
         goal_accuracy (float): level goal accuracy
+        level_id (str): the path to the file of the level, texts.DRILL_LEVEL_ID for drills
     """
-    def __init__(self, speed: float, goal_speed: float, accuracy: float, goal_accuracy: float):
+    def __init__(self, speed: float, goal_speed: float, accuracy: float, goal_accuracy: float, level_id: str):
         super().__init__()
         self.set_alignment(qtc.Qt.AlignmentFlag.AlignCenter)
         self.add_stretch()
         self.add_widget(self.make_score_widget(speed, goal_speed, accuracy, goal_accuracy))
-        self.add_widget(self.make_buttons())
+        self.add_widget(self.make_buttons(level_id))
         self.add_stretch()
 
-    @staticmethod
-    def get_score(speed: float, goal_speed: float, accuracy: float, goal_accuracy: float) -> int:
-        """
-        Calculates the score of user based on his speed and accuracy.
-        The score is an integer from 0 to 5000
-        Parameters:
-            speed (float): user's speed
-            goal_speed (float): level goal speed
-            accuracy (float): user's accuracy
-            goal_accuracy (float): level goal accuracy
-        Returns:
-            score (int)
-        """
-        return math.ceil(min(speed, goal_speed) / goal_speed * 2500 +
-                         min(accuracy, goal_accuracy) / goal_accuracy * 2500)
-
     def make_score_widget(self, speed: float, goal_speed: float, accuracy: float, goal_accuracy: float) -> qtw.QFrame:
         """
         Creates a widget showing score, speed and accuracy
@@ -197,7 +318,7 @@ class FinishLayout(qtw.QVBoxLayout):
         score_widget.set_fixed_size(qtc.QSize(sizes.SCORE_WINDOW_WIDTH, sizes.SCORE_WINDOW_HEIGHT))
         layout = qtw.QVBoxLayout()
         layout.set_alignment(qtc.Qt.AlignmentFlag.AlignCenter)
-        score_text = qtw.QLabel(text=f'{self.get_score(speed, goal_speed, accuracy, goal_accuracy)}')
+        score_text = qtw.QLabel(text=f'{TypingSession.get_score(speed, goal_speed, accuracy, goal_accuracy)}')
         score_text.font = fonts.TYPER_SCORE_FONT
         score_text.set_style_sheet(f'color: {colors.GREEN_COLOR}')
         layout.add_stretch()
@@ -211,9 +332,11 @@ class FinishLayout(qtw.QVBoxLayout):
         return score_widget
 
     @staticmethod
-    def make_buttons() -> qtw.QFrame:
+    def make_buttons(level_id: str) -> qtw.QFrame:
         """
         Creates the buttons to main menu, restart and next level
+        Parameters:
+            level_id (str): the path to the file of the level
         Returns:
             buttons (QFrame)
         """
@@ -222,38 +345,157 @@ class FinishLayout(qtw.QVBoxLayout):
         layout = qtw.QHBoxLayout()
         layout.add_widget(BaseButton(texts.HOME_BUTTON, MainWindowActions().home_function))
         layout.add_widget(BaseButton(texts.RESTART_BUTTON, MainWindowActions().restart_function))
-        layout.add_widget(BaseButton(texts.NEXT_BUTTON, MainWindowActions().next_level_function))
+        next_button = BaseButton(texts.NEXT_BUTTON, MainWindowActions().next_level_function)
+        menu = FinishLayout.make_next_menu(level_id, next_button)
+        if menu is not None:
+            next_button.set_menu(menu)
+        layout.add_widget(next_button)
         buttons.set_layout(layout)
         return buttons
 
+    @staticmethod
+    def make_next_menu(level_id: str, parent: qtw.QWidget) -> qtw.QMenu | None:
+        """
+        Creates the menu of the next level in order and the levels training the weakest symbols of the user
+        Parameters:
+            level_id (str): the path to the file of the level
+            parent (QWidget): the parent widget of the menu
+        Returns:
+            menu (QMenu | None): None in case there are no levels to recommend or the levels are not ranked yet,
+                                 the next level is run without menu
+        """
+        recommender = LevelRecommender.get_instance()
+        if recommender is None or not recommender.ready.is_set():  # the levels are ranked in background on start
+            return None
+        catalog = LevelCatalog()
+        next_path = catalog.get_next_path(level_id)
+        recommended = recommender.recommend(ProfileManager().get_calculator().symbols, limits.RECOMMENDED_LEVELS,
+                                            (level_id, next_path))
+        if not recommended:
+            return None
+        menu = qtw.QMenu(parent)
+        menu.font = fonts.TYPER_STATUS_BAR_FONT
+        actions = MainWindowActions()
+        if next_path is not None:
+            menu.add_action(texts.NEXT_LEVEL_TEXT.format(FinishLayout.get_title(next_path)),
+                            actions.next_level_function)
+            menu.add_separator()
+        for path in recommended:
+            menu.add_action(texts.RECOMMENDED_LEVEL_TEXT.format(FinishLayout.get_title(path)),
+                            partial(actions.level_run_function, path))
+        return menu
+
+    @staticmethod
+    def get_title(path: str) -> str:
+        """
+        Returns the title of the level, the path in case the level is not valid anymore
+        Parameters:
+            path (str): path to the file of the level
+        Returns:
+            title (str)
+        """
+        level = LevelCatalog().get_level(path)
+        return level.title if level is not None else path
+
 
 class TypingSpeedometer(qtw.QStatusBar):
     """
     TypingSpeedometer is a status bar to show current speed, inherits QStatusBar
-    Does not take any parameters
+    The speed is refreshed by a timer limits.SPEEDOMETER_RATE times per second, not on every type,
+    the label is repainted only when its text changes
+
+    Parameters:
+        session (TypingSession): the session to show the speed of
+
+    Attributes:
+        session (TypingSession)
+        label (QLabel): the label with the speed
+        timer (QTimer): the timer refreshing the speed
+        rolling_speed (float): the rolling speed shown
     """
-    def __init__(self):
+    def __init__(self, session: TypingSession):
         super().__init__()
         self.font = fonts.TYPER_STATUS_BAR_FONT
+        self.session = session
+        self.rolling_speed = 0.0
+        self.label = qtw.QLabel()
+        self.add_widget(self.label)
+        self.timer = qtc.QTimer(self)
+        self.timer.interval = 1000 // limits.SPEEDOMETER_RATE
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start()
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Shows the cumulative and the rolling speed, stops the timer when the level is finished,
+        the rolling speed shown last stays after the finish
+        """
+        session = self.session
+        if session.is_finished():  # the rolling speed is kept, the moments passed to it should not decrease
+            self.timer.stop()
+        else:
+            self.rolling_speed = session.get_rolling_speed(time.perf_counter_ns())
+        text = (f'{texts.SPEED_TEXT}: {session.get_speed():.2f} {texts.SPEED_RESOLUTION}   '
+                f'{texts.ROLLING_SPEED_TEXT.format(limits.SPEED_WINDOW)}: '
+                f'{self.rolling_speed:.2f} {texts.SPEED_RESOLUTION}')
+        if text != self.label.text:
+            self.label.text = text
 
 
 class TypingPage(BasePage):
     """
     TypingPage is a page where user completes the level
+    In case the level was completed on the same text before, the fastest attempt is raced as a ghost,
+    it can be hidden with the check box of the status bar
 
     Parameters:
-        file_path (str): path to file with level
+        level (Level): the level to run
+
+    Attributes:
+        typer (Typer): the typer of the level
+        ghost (GhostTimeline | None): the fastest attempt, None in case there is none
     """
-    def __init__(self, file_path: str):
+    def __init__(self, level: Level):
         super().__init__()
-        with open(file_path, 'r') as file:
-            all_lines = file.readlines()
-        header = all_lines[0]
-        goal_speed, goal_accuracy = map(float, all_lines[1].split())
-        text = ''.join(all_lines[2:])
         layout = qtw.QVBoxLayout()
-        layout.add_widget(BaseHeader(header))
-        status_bar = qtw.QStatusBar()
-        layout.add_widget(Typer(text, goal_speed, goal_accuracy, status_bar))
-        layout.add_widget(status_bar)
+        layout.add_widget(BaseHeader(level.title))
+        self.typer = Typer(level.text, level.path, level.goal_speed, level.goal_accuracy)
+        layout.add_widget(self.typer)
+        speedometer = TypingSpeedometer(self.typer.session)
+        layout.add_widget(speedometer)
+        self.ghost = self.load_ghost(level)
+        if self.ghost is not None:
+            ghost_box = qtw.QCheckBox(texts.GHOST_TEXT)
+            ghost_box.checked = True
+            ghost_box.toggled.connect(self.show_ghost)
+            speedometer.add_permanent_widget(ghost_box)
+            self.typer.set_ghost(self.ghost)
         self.set_layout(layout)
+
+    def load_ghost(self, level: Level) -> GhostTimeline | None:
+        """
+        Returns the timeline of the fastest attempt of the level typed on the same text
+        Parameters:
+            level (Level): the level
+        Returns:
+            ghost (GhostTimeline | None): None in case there is no such attempt
+        """
+        store = ProfileManager().get_calculator().get_store()
+        if store is None:
+            return None
+        recording = store.get_best_recording(level.path, self.typer.recording.content_hash)
+        if recording is None:
+            return None
+        try:
+            return GhostTimeline(recording, level.text)
+        except ValueError:
+            return None
+
+    def show_ghost(self, shown: bool) -> None:
+        """
+        Shows or hides the ghost
+        Parameters:
+            shown (bool): whether to show the ghost
+        """
+        self.typer.set_ghost(self.ghost if shown else None)
@@ -0,0 +1,204 @@
+import math
+from collections import Counter
+from collections.abc import Iterable
+
+from constraints import limits
+from key_timings import KeyTimings, LatencyStats, RollingCounter
+from streamed_text import StreamedText
+
+
+class TypingSession:
+    """
+    TypingSession is the state of typing a text: progress, mistakes, speed, accuracy and score
+    It does not depend on Qt, the moments of types are passed in nanoseconds of a monotonic clock
+
+    Parameters:
+        text (str | StreamedText): text to type
+        goal_speed (float): speed user should have to get maximal score
+        goal_accuracy (float): accuracy user should have to get maximal score
+        key_buffer_size (int): number of the last key events to keep timings of
+        speed_window (float): length of the window of the rolling speed in seconds
+
+    Attributes:
+        text (str | StreamedText): the text to type
+        goal_speed (float)
+        goal_accuracy (float)
+        progress (int): the number of symbols typed correctly
+        start_time_stamp (int | None): the moment of the first type, None before it
+        last_time_stamp (int | None): the moment of the last type
+        mistakes_counter (Counter[str, int]): Counter counting mistakes
+        key_timings (KeyTimings): the moments of the last key events
+        rolling_counter (RollingCounter): the number of correct types in the rolling speed window
+    """
+    __slots__ = ('text', 'goal_speed', 'goal_accuracy', 'progress', 'start_time_stamp', 'last_time_stamp',
+                 'mistakes_counter', 'key_timings', 'rolling_counter')
+
+    def __init__(self, text: str | StreamedText, goal_speed: float, goal_accuracy: float,
+                 key_buffer_size: int = limits.KEY_EVENTS_BUFFER_SIZE, speed_window: float = limits.SPEED_WINDOW):
+        self.text = text
+        self.goal_speed = goal_speed
+        self.goal_accuracy = goal_accuracy
+        self.progress = 0
+        self.start_time_stamp = None
+        self.last_time_stamp = None
+        self.mistakes_counter = Counter()
+        self.key_timings = KeyTimings(key_buffer_size)
+        self.rolling_counter = RollingCounter(self.key_timings, round(speed_window * 10 ** 9))
+
+    def is_finished(self) -> bool:
+        """
+        Returns whether the whole text is typed
+        Returns:
+            finished (bool)
+        """
+        return self.progress == len(self.text)
+
+    def type(self, symbol: str, time_stamp: int) -> bool:
+        """
+        Checks the typed symbol, moves the progress if it is correct and counts the mistake otherwise
+        Parameters:
+            symbol (str): symbol typed
+            time_stamp (int): the moment of the type in nanoseconds
+        Returns:
+            correct (bool): whether the symbol was correct
+        """
+        if self.start_time_stamp is None:
+            self.start_time_stamp = time_stamp
+        self.last_time_stamp = time_stamp
+        need = self.text[self.progress]
+        correct = need == symbol
+        self.key_timings.record(time_stamp, self.progress, correct)
+        if correct:
+            self.progress += 1
+        else:
+            self.mistakes_counter[need] += 1
+        return correct
+
+    def type_text(self, symbols: str, time_stamp: int) -> int:
+        """
+        Checks the symbols typed by one input event at once: the runs matching the text move the progress in one step,
+        every other symbol is a mistake at the current position, like the symbols were typed one by one.
+        The symbols typed after the end of the text are ignored
+        Parameters:
+            symbols (str): symbols typed
+            time_stamp (int): the moment of the type in nanoseconds
+        Returns:
+            correct (int): the number of the symbols typed correctly
+        """
+        if self.start_time_stamp is None:
+            self.start_time_stamp = time_stamp
+        self.last_time_stamp = time_stamp
+        text, length = self.text, len(self.text)
+        start_progress = self.progress
+        i = 0
+        while i < len(symbols) and self.progress < length:
+            expected = text[self.progress:self.progress + len(symbols) - i]
+            if symbols.startswith(expected, i):
+                matched = len(expected)
+            else:  # there is a mismatch inside expected
+                matched = 0
+                while symbols[i + matched] == expected[matched]:
+                    matched += 1
+            if matched:
+                self.key_timings.record_run(time_stamp, self.progress, matched)
+                self.progress += matched
+                i += matched
+            if i < len(symbols) and self.progress < length:
+                need = text[self.progress]
+                self.key_timings.record(time_stamp, self.progress, False)
+                self.mistakes_counter[need] += 1
+                i += 1
+        return self.progress - start_progress
+
+    def replay(self, keystrokes: Iterable[tuple[str, int]]) -> int:
+        """
+        Types the symbols of the stream until the text is finished
+        Parameters:
+            keystrokes (Iterable[tuple[str, int]]): pairs of a symbol and the moment of its type in nanoseconds
+        Returns:
+            count (int): number of keystrokes used
+        """
+        count = 0
+        for symbol, time_stamp in keystrokes:
+            if self.is_finished():
+                break
+            self.type(symbol, time_stamp)
+            count += 1
+        return count
+
+    def get_speed(self, time_stamp: int | None = None) -> float:
+        """
+        Return current speed in Words Per Minute
+        Parameters:
+            time_stamp (int | None): the current moment in nanoseconds, the moment of the last type by default
+        Returns:
+            speed (float)
+        """
+        if time_stamp is None:
+            time_stamp = self.last_time_stamp
+        if self.start_time_stamp is None or time_stamp <= self.start_time_stamp:
+            return 0.0
+        cur_time = (time_stamp - self.start_time_stamp) / 10 ** 9 / 60  # in minutes
+        cur_word_count = self.progress / 5  # in words
+        return cur_word_count / cur_time
+
+    def get_rolling_speed(self, time_stamp: int) -> float:
+        """
+        Return speed in Words Per Minute of the correct types made in the last window of time,
+        in case less time passed since the first type, the speed over that time
+        Parameters:
+            time_stamp (int): the current moment in nanoseconds, should not decrease between calls
+        Returns:
+            speed (float)
+        """
+        if self.start_time_stamp is None:
+            return 0.0
+        correct = self.rolling_counter.update(time_stamp)
+        window = min(self.rolling_counter.window, time_stamp - self.start_time_stamp)
+        if window <= 0:
+            return 0.0
+        return correct / 5 / (window / 10 ** 9 / 60)
+
+    def get_accuracy(self) -> float:
+        """
+        Return current accuracy, the share of symbols typed correctly
+        Returns:
+            accuracy (float)
+        """
+        all_cnt = self.progress + self.mistakes_counter.total()
+        if all_cnt == 0:
+            return 0.0
+        return self.progress / all_cnt
+
+    @staticmethod
+    def get_score(speed: float, goal_speed: float, accuracy: float, goal_accuracy: float) -> int:
+        """
+        Calculates the score of user based on his speed and accuracy.
+        The score is an integer from 0 to 5000
+        Parameters:
+            speed (float): user's speed
+            goal_speed (float): level goal speed
+            accuracy (float): user's accuracy
+            goal_accuracy (float): level goal accuracy
+        Returns:
+            score (int)
+        """
+        return math.ceil(min(speed, goal_speed) / goal_speed * 2500 +
+                         min(accuracy, goal_accuracy) / goal_accuracy * 2500)
+
+    def get_result_score(self) -> int:
+        """
+        Returns the score of the session by current speed and accuracy
+        Returns:
+            score (int)
+        """
+        return self.get_score(self.get_speed(), self.goal_speed, self.get_accuracy(), self.goal_accuracy)
+
+    def get_latencies(self) -> dict[str, LatencyStats]:
+        """
+        Returns the latency statistics of the symbols and the bigrams of the text
+        Returns:
+            latencies (dict[str, LatencyStats])
+        """
+        symbol_latencies, bigram_latencies = self.key_timings.get_latency_stats(self.text)
+        return symbol_latencies | bigram_latencies
@@ -5,6 +5,7 @@ from base_page import BasePage
 from base_header import BaseHeader
 from base_button import BaseButton
 from main_window_actions import MainWindowActions
+from level_indexer import LevelIndexer
 
 
 class Instruction(qtw.QTextBrowser):
@@ -35,7 +36,10 @@ class UploadLevelPage(BasePage):
 
     def load_level(self) -> None:
         """
-        Shows the dialog to choose file and loads chosen level
+        Shows the dialog to choose file and loads chosen level, a valid level is added to the levels menu
+        on a background thread
         """
         file_name = qtw.QFileDialog.get_open_file_name(self, filter='Text (*.txt)')[0]
+        if file_name:
+            LevelIndexer().add_path(file_name)
         MainWindowActions().level_run_function(file_name)